@@ -1,8 +1,35 @@
 from django.contrib import admin
-from .models import Profile
+from .models import Profile, MarkingJob, MarkingResult, SheetRowMirror, SheetSyncState
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "role", "coach_id")
     list_filter = ("role",)
     search_fields = ("user__username", "user__email", "coach_id")
+
+
+@admin.register(MarkingJob)
+class MarkingJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "group", "evidence_id", "student_id", "status", "created_at")
+    list_filter = ("status", "group")
+    search_fields = ("evidence_id", "student_id")
+
+
+@admin.register(MarkingResult)
+class MarkingResultAdmin(admin.ModelAdmin):
+    list_display = ("evidence_id", "group", "student_id", "marked_at")
+    list_filter = ("group",)
+    search_fields = ("evidence_id", "student_id")
+
+
+@admin.register(SheetSyncState)
+class SheetSyncStateAdmin(admin.ModelAdmin):
+    list_display = ("sheet_title", "row_count", "revision", "synced_at")
+    search_fields = ("sheet_title",)
+
+
+@admin.register(SheetRowMirror)
+class SheetRowMirrorAdmin(admin.ModelAdmin):
+    list_display = ("sheet_title", "row_index", "student_id", "student_email", "group", "synced_at")
+    list_filter = ("sheet_title",)
+    search_fields = ("student_id", "student_email")
@@ -0,0 +1,252 @@
+"""
+Database mirror of the evidence spreadsheet
+Student rows of every non-output sheet are copied into SheetRowMirror so
+component lookups are a couple of indexed queries instead of Sheets reads.
+The sync is incremental: rows whose hash hasn't changed are left alone.
+"""
+import hashlib
+import json
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SheetRowMirror, SheetSyncState
+from .sheets import (
+    SPREADSHEET_ID,
+    get_sheets_list,
+    candidate_sheets,
+    iter_student_rows,
+    row_keys,
+    target_sheet_for_group,
+    parse_component_cell,
+)
+from .read_planner import fetch_planned
+from .sheet_schemas import build_schema
+from .sheets_backends import get_sheets_backend
+from .student_directory import normalize_email, normalize_id
+
+
+def row_hash(row):
+    return hashlib.sha256(json.dumps(row, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def mirror_fields(row):
+    """Indexed lookup columns for one sheet row"""
+    email = row[1] if len(row) > 1 and '@' in str(row[1]) else None
+    if email is None:
+        email_keys, _ = row_keys(row)
+        email = email_keys[0] if email_keys else ''
+
+    return {
+        'student_id': normalize_id(row[0])[:64],
+        'student_email': normalize_email(email)[:254],
+        'group': str(row[4]).strip()[:64] if len(row) > 4 else '',
+    }
+
+
+def sync_sheet(title, index, rows, synced_at):
+    """Bring one sheet's mirror rows in line with `rows`, returns (created, updated, unchanged, deleted)"""
+    existing = {
+        mirror.row_index: mirror
+        for mirror in SheetRowMirror.objects.filter(sheet_title=title).only('id', 'row_index', 'row_hash')
+    }
+
+    to_create = []
+    to_update = []
+    hashes = []
+    for i, row in iter_student_rows(rows):
+        digest = row_hash(row)
+        hashes.append(digest)
+
+        mirror = existing.pop(i, None)
+        if mirror is None:
+            to_create.append(SheetRowMirror(
+                sheet_title=title, sheet_index=index, row_index=i,
+                row=row, row_hash=digest, **mirror_fields(row)
+            ))
+        elif mirror.row_hash != digest:
+            for field, value in mirror_fields(row).items():
+                setattr(mirror, field, value)
+            mirror.sheet_index = index
+            mirror.row = row
+            mirror.row_hash = digest
+            mirror.synced_at = synced_at
+            to_update.append(mirror)
+
+    with transaction.atomic():
+        SheetRowMirror.objects.bulk_create(to_create, batch_size=500)
+        SheetRowMirror.objects.bulk_update(
+            to_update,
+            ['sheet_index', 'student_id', 'student_email', 'group', 'row', 'row_hash', 'synced_at'],
+            batch_size=500
+        )
+        # Rows that are gone from the sheet (or are no longer student rows)
+        deleted = 0
+        if existing:
+            deleted, _ = SheetRowMirror.objects.filter(pk__in=[m.pk for m in existing.values()]).delete()
+
+        SheetSyncState.objects.update_or_create(
+            sheet_title=title,
+            defaults={
+                'sheet_index': index,
+                'header': rows[0] if rows else [],
+                'row_count': len(hashes),
+                'revision': hashlib.sha256(''.join(hashes).encode()).hexdigest(),
+                'synced_at': synced_at,
+            }
+        )
+
+    unchanged = len(hashes) - len(to_create) - len(to_update)
+    return len(to_create), len(to_update), unchanged, deleted
+
+
+def sync_mirror(backend=None):
+    """
+    Mirror every non-output sheet of the evidence spreadsheet (one batchGet)
+    Returns counts of created / updated / unchanged / deleted rows
+    """
+    backend = backend or get_sheets_backend()
+    sheets = get_sheets_list(backend, SPREADSHEET_ID)
+    titles = candidate_sheets(sheets)
+    sheet_rows = fetch_planned(backend, SPREADSHEET_ID, titles)
+    index_of = {s['title']: s['index'] or 0 for s in sheets}
+    synced_at = timezone.now()
+
+    stats = {'sheets': len(titles), 'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    for title, rows in sheet_rows.items():
+        counts = sync_sheet(title, index_of.get(title, 0), rows, synced_at)
+        for key, count in zip(('created', 'updated', 'unchanged', 'deleted'), counts):
+            stats[key] += count
+
+    # Sheets that were removed or renamed
+    gone = SheetRowMirror.objects.exclude(sheet_title__in=titles)
+    stats['deleted'] += gone.delete()[0]
+    SheetSyncState.objects.exclude(sheet_title__in=titles).delete()
+
+    return stats
+
+
+def mirror_is_fresh():
+    """True when every mirrored sheet was synced within MIRROR_MAX_AGE seconds"""
+    max_age = getattr(settings, 'MIRROR_MAX_AGE', 900)
+    oldest = SheetSyncState.objects.order_by('synced_at').values_list('synced_at', flat=True).first()
+    return oldest is not None and timezone.now() - oldest <= timedelta(seconds=max_age)
+
+
+_sync_lock = threading.Lock()
+_sync_thread = None
+
+
+def sync_mirror_in_background():
+    """Start a mirror sync unless one is already running in this process"""
+    global _sync_thread
+    with _sync_lock:
+        if _sync_thread is not None:
+            return
+        _sync_thread = threading.Thread(target=_background_sync, name='evidence-mirror-sync', daemon=True)
+        _sync_thread.start()
+
+
+def _background_sync():
+    global _sync_thread
+    try:
+        sync_mirror()
+    except Exception:
+        # Sheets unavailable or a bad row - requests keep using live Sheets
+        pass
+    finally:
+        close_old_connections()
+        with _sync_lock:
+            _sync_thread = None
+
+
+def _find_mirror_row(queryset, email, student_id):
+    match = Q()
+    if email:
+        match |= Q(student_email=email)
+    if student_id:
+        match |= Q(student_id=student_id)
+    if not match:
+        return None
+    return queryset.filter(match).order_by('sheet_index', 'row_index').first()
+
+
+def _mirror_match(student_email=None, student_id=None):
+    """
+    (directory row, target sheet state, target row, schema) of the student
+    in the mirror, or None when the mirror can't answer for them
+    """
+    found = _find_mirror_row(
+        SheetRowMirror.objects.all(), normalize_email(student_email), normalize_id(student_id)
+    )
+    if found is None or not found.group:
+        return None
+
+    row = found.row
+    target_sheet = target_sheet_for_group(row[4])
+    state = SheetSyncState.objects.filter(sheet_title=target_sheet).first()
+    if state is None:
+        return None
+
+    student_email_found = row[1] if len(row) > 1 else ''
+    student_id_found = row[0] if len(row) > 0 else ''
+
+    schema = build_schema(target_sheet, state.header)
+    target = _find_mirror_row(
+        SheetRowMirror.objects.filter(sheet_title=target_sheet, row_index__gte=schema.start_row),
+        normalize_email(student_email_found) if isinstance(student_email_found, str) else '',
+        normalize_id(student_id_found),
+    )
+    if target is None:
+        return None
+
+    target_row = target.row
+    if not (target_row[schema.component_index] if schema.component_index < len(target_row) else None):
+        return None
+
+    return found, state, target, schema
+
+
+def mirror_revision(student_email=None, student_id=None):
+    """
+    Version of the mirrored rows behind a student's components - changes
+    whenever a sync changes them. None when the mirror doesn't have the student
+    """
+    match = _mirror_match(student_email, student_id)
+    if match is None:
+        return None
+
+    found, state, target, _ = match
+    return hashlib.sha256(
+        json.dumps([found.row_hash, target.row_hash, state.header]).encode('utf-8')
+    ).hexdigest()
+
+
+def get_mirrored_components(student_email=None, student_id=None):
+    """
+    Same result as get_student_components(), served from the mirror
+    Returns None when the mirror doesn't have the student, so callers can
+    fall back to live Sheets
+    """
+    match = _mirror_match(student_email, student_id)
+    if match is None:
+        return None
+
+    found, state, target, schema = match
+    row = found.row
+    target_row = target.row
+    component_name = target_row[schema.component_index]
+
+    return {
+        'student_id': row[0] if len(row) > 0 else '',
+        'student_email': row[1] if len(row) > 1 else '',
+        'group': row[4],
+        'target_sheet': state.sheet_title,
+        'components': parse_component_cell(component_name),
+        'evidence': target_row[schema.evidence_index] if schema.evidence_index < len(target_row) else None,
+        'raw_component_name': component_name
+    }
@@ -0,0 +1,217 @@
+"""
+Structured evidence
+Parses the evidence cell (a JSON array string) on the server, groups the
+items by ComponentId with per-status counts, and keeps the parsed result
+per (target sheet, student, cell revision) so reopening a student skips
+the parse
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def parse_evidence_items(evidence_data):
+    """
+    Parse the evidence cell (a JSON array string) into a list of items
+    Same normalization as parseEvidenceData in the frontend
+    """
+    if isinstance(evidence_data, str):
+        try:
+            evidence_data = json.loads(evidence_data)
+        except ValueError:
+            return []
+    
+    if not isinstance(evidence_data, list):
+        return []
+    
+    items = []
+    for item in evidence_data:
+        if not isinstance(item, dict):
+            continue
+        items.append({
+            'id': item.get('Id') or item.get('id') or '',
+            'componentId': item.get('ComponentId') or item.get('componentId') or '',
+            'name': item.get('Name') or item.get('name') or 'Unnamed Evidence',
+            'url': item.get('Url') or item.get('url') or '',
+            'status': item.get('Status') or item.get('status') or 'Unknown',
+            'createdDate': item.get('CreatedDate') or item.get('createdDate') or '',
+        })
+    
+    return items
+
+
+def component_names(components):
+    """componentId -> componentName from the components cell"""
+    names = {}
+    if isinstance(components, list):
+        for comp in components:
+            if not isinstance(comp, dict):
+                continue
+            comp_id = comp.get('componentId') or comp.get('ComponentId')
+            comp_name = comp.get('componentName') or comp.get('ComponentName')
+            if comp_id is not None and comp_name:
+                names[str(comp_id)] = comp_name
+    return names
+
+
+def count_statuses(items):
+    counts = {}
+    for item in items:
+        counts[item['status']] = counts.get(item['status'], 0) + 1
+    return counts
+
+
+def group_evidence(evidence_data, components):
+    """
+    Parsed evidence grouped by componentId, in order of first appearance:
+    {'total', 'status_counts', 'groups': [{'component_id', 'component_name',
+    'total', 'status_counts', 'items'}]}
+    """
+    items = parse_evidence_items(evidence_data)
+    names = component_names(components)
+
+    groups = OrderedDict()
+    for item in items:
+        key = str(item['componentId'])
+        if key not in groups:
+            groups[key] = {
+                'component_id': item['componentId'],
+                'component_name': names.get(key, ''),
+                'items': [],
+            }
+        groups[key]['items'].append(item)
+
+    for group in groups.values():
+        group['total'] = len(group['items'])
+        group['status_counts'] = count_statuses(group['items'])
+
+    return {
+        'total': len(items),
+        'status_counts': count_statuses(items),
+        'groups': list(groups.values()),
+    }
+
+
+class ParsedEvidenceCache:
+    """Small LRU of group_evidence() results"""
+
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return getattr(settings, 'EVIDENCE_PARSE_CACHE_SIZE', 512)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+parsed_evidence_cache = ParsedEvidenceCache()
+
+
+def evidence_revision(evidence_data, components):
+    """Hash of the evidence and component cells - changes whenever either does"""
+    digest = hashlib.sha256()
+    for value in (evidence_data, components):
+        raw = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+        digest.update(raw.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def parsed_evidence(result):
+    """group_evidence() for a get_student_components() result, cached per student and revision"""
+    revision = evidence_revision(result.get('evidence'), result.get('raw_component_name'))
+    key = (result.get('target_sheet'), str(result.get('student_id')), revision)
+
+    parsed = parsed_evidence_cache.get(key)
+    if parsed is None:
+        parsed = group_evidence(result.get('evidence'), result.get('components'))
+        parsed['revision'] = revision
+        parsed_evidence_cache.set(key, parsed)
+    return parsed
+
+
+def structure_evidence(result, status=None, component_id=None, page=1, page_size=None):
+    """
+    Swap the raw evidence cell of a get_student_components() result for the
+    parsed, grouped evidence ('evidence_parsed'), filtered by status /
+    componentId and paged
+    (page_size None returns every item). Counts in 'total' and
+    'status_counts' cover all of the student's evidence.
+    """
+    parsed = parsed_evidence(result)
+
+    statuses = set(status) if isinstance(status, (list, tuple, set)) else ({status} if status else None)
+    filtered = []
+    for group in parsed['groups']:
+        if component_id and str(group['component_id']) != str(component_id):
+            continue
+        for item in group['items']:
+            if statuses is None or item['status'] in statuses:
+                filtered.append((group, item))
+
+    page = max(1, page)
+    if page_size:
+        pages = max(1, -(-len(filtered) // page_size))
+        window = filtered[(page - 1) * page_size:page * page_size]
+    else:
+        pages = 1
+        window = filtered if page == 1 else []
+
+    groups = OrderedDict()
+    for group, item in window:
+        key = str(group['component_id'])
+        if key not in groups:
+            groups[key] = {
+                'component_id': group['component_id'],
+                'component_name': group['component_name'],
+                'total': group['total'],
+                'status_counts': group['status_counts'],
+                'items': [],
+            }
+        groups[key]['items'].append(item)
+
+    structured = {key: value for key, value in result.items() if key != 'evidence'}
+    structured['evidence_parsed'] = {
+        'revision': parsed['revision'],
+        'total': parsed['total'],
+        'status_counts': parsed['status_counts'],
+        'components': [
+            {
+                'component_id': group['component_id'],
+                'component_name': group['component_name'],
+                'total': group['total'],
+                'status_counts': group['status_counts'],
+            }
+            for group in parsed['groups']
+        ],
+        'filtered': len(filtered),
+        'page': page,
+        'page_size': page_size,
+        'pages': pages,
+        'groups': list(groups.values()),
+    }
+    return structured
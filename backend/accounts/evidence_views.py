@@ -2,150 +2,75 @@
 Google Sheets Evidence Loading
 Fetches student components and evidence from Google Sheets
 """
-import os
+import asyncio
+import hashlib
+import hmac
 import json
 import time
-from pathlib import Path
+import uuid
 
 from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
-
-# Spreadsheet ID from the URL
-SPREADSHEET_ID = "1K5gdYpM3ULvMZ-5SisQZjXSSdtoT1p3Fl6gS-rxMuCg"
-
-# Group to sheet name mapping (from PHP code)
-# Extended to support more groups
-GROUP_SHEET_MAPPING = {
-    "A": "Level 3 CM",
-    "B": "Level 5 LO",
-    "C": "Level 5 HRM",
-    "D": "Level 5 Business Management",
-    "E": "Top-up",
-    "PCP": "PCP",  # PCP maps to PCP sheet
-    "ME": "ME",    # ME maps to ME sheet  
-    "PDF": "PDF",  # PDF maps to PDF sheet
-}
-
-
-def get_service_account_path():
-    """Get path to service account JSON file"""
-    # Try backend directory first
-    backend_dir = Path(settings.BASE_DIR)
-    sa_path = backend_dir / "ai-marking-tool-480910-1f3c7a43f500.json"
-    
-    if sa_path.exists():
-        return str(sa_path)
-    
-    return None
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
-
-def get_sheets_service():
-    """Create authenticated Google Sheets service"""
-    sa_path = get_service_account_path()
-    
-    if not sa_path:
-        raise ValueError("Service account file not found")
-    
-    credentials = service_account.Credentials.from_service_account_file(
-        sa_path,
-        scopes=['https://www.googleapis.com/auth/spreadsheets']
-    )
-    
-    service = build('sheets', 'v4', credentials=credentials)
-    return service
+from .marking import (
+    FINISHED_STATUSES,
+    build_processing_row,
+    enqueue_marking_jobs,
+    expire_orphaned_job,
+    follow_marking_job,
+    in_flight_job,
+    ingest_output_row,
+    latest_marking_result,
+    serialize_job,
+    serialize_batch,
+    serialize_result,
+    submit_marking_job,
+)
+from .evidence_parsing import parse_evidence_items, structure_evidence
+from .evidence_mirror import (
+    get_mirrored_components,
+    mirror_is_fresh,
+    mirror_revision,
+    sync_mirror_in_background,
+)
+from .marking_events import marking_events
+from .models import MarkingJob, MarkingResult
+from .sheets import (
+    SPREADSHEET_ID,
+    get_sheets_list,
+    candidate_sheets,
+    iter_student_rows,
+    row_keys,
+    target_sheet_for_group,
+    parse_component_cell,
+)
+from .read_planner import fetch_planned
+from .sheet_schemas import schema_for
+from .sheets_backends import get_sheets_backend
+from .sheets_quota import SheetsUnavailable
+from .student_directory import StudentDirectory, StudentEntry, normalize_email, normalize_id
 
 
-def get_sheets_list(service, spreadsheet_id):
-    """Get list of all sheets in the spreadsheet"""
-    try:
-        spreadsheet = service.spreadsheets().get(
-            spreadsheetId=spreadsheet_id,
-            fields='sheets.properties'
-        ).execute()
-        
-        sheets = []
-        for sheet in spreadsheet.get('sheets', []):
-            props = sheet.get('properties', {})
-            sheets.append({
-                'title': props.get('title'),
-                'sheetId': props.get('sheetId'),
-                'index': props.get('index')
-            })
-        
-        return sheets
-    except HttpError as e:
-        raise ValueError(f"Failed to get sheets list: {e}")
-
-
-def get_sheet_data(service, spreadsheet_id, range_name):
-    """Fetch data from a specific sheet range"""
-    try:
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_name
-        ).execute()
-        
-        return result.get('values', [])
-    except HttpError as e:
-        raise ValueError(f"Failed to get sheet data: {e}")
-
-
-def find_student_in_sheets(service, spreadsheet_id, student_email=None, student_id=None):
-    """
-    Find student in the spreadsheet and return their row data and sheet info
-    Similar to PHP ad_get_student_components_internal logic
-    """
-    if not student_email and not student_id:
-        raise ValueError("Either student_email or student_id is required")
-    
-    # Normalize search terms
-    search_email = student_email.lower().strip() if student_email else None
-    search_id = str(student_id).strip() if student_id else None
-    
-    # Get all sheets
-    sheets = get_sheets_list(service, spreadsheet_id)
-    
-    # Search through sheets to find the student
-    found_data = None
-    found_sheet = None
-    
-    for sheet in sheets:
-        sheet_title = sheet['title']
-        
-        # Skip only output sheets (allow target sheets to be searched)
-        if 'output' in sheet_title.lower():
-            continue
-        
-        # Fetch sheet data
-        range_name = f"{sheet_title}!A:Z"
-        try:
-            rows = get_sheet_data(service, spreadsheet_id, range_name)
-        except:
-            continue
+def _search_sheets(sheets, sheet_rows, search_email, search_id):
+    """Scan the fetched rows of every non-output sheet for the student"""
+    for sheet_title in candidate_sheets(sheets):
+        rows = sheet_rows.get(sheet_title)
         
         if not rows or len(rows) < 2:  # Need at least header + 1 row
             continue
         
         # Search for student in rows
         # Check multiple columns for email (columns 1-5)
-        for i, row in enumerate(rows):
-            if len(row) < 2:
-                continue
-            
-            # Skip header row if it looks like a header
-            if i == 0 and any(isinstance(cell, str) and 
-                             cell.lower() in ['email', 'student email', 'id', 'student id', 'name'] 
-                             for cell in row[:6]):
-                continue
-            
+        for i, row in iter_student_rows(rows):
             # Match by email - check first 6 columns for email
             match = False
             if search_email:
@@ -164,43 +89,114 @@ def find_student_in_sheets(service, spreadsheet_id, student_email=None, student_
                         break
             
             if match:
-                found_data = {
-                    'row': row,
-                    'row_index': i,
-                    'sheet_title': sheet_title
-                }
-                found_sheet = sheet
-                break
+                return StudentEntry(
+                    sheet_title=sheet_title,
+                    row_index=i,
+                    group=row[4] if len(row) > 4 else None,
+                    row=row,
+                )
+    
+    return None
+
+
+def _directory_entries(sheet_rows):
+    """Student directory entries for fetched sheet rows, in sheet/row order"""
+    entries = []
+    for sheet_title, rows in sheet_rows.items():
+        if not rows or len(rows) < 2:
+            continue
+
+        for i, row in iter_student_rows(rows):
+            email_keys, id_keys = row_keys(row)
+            entry = StudentEntry(
+                sheet_title=sheet_title,
+                row_index=i,
+                group=row[4] if len(row) > 4 else None,
+                row=row,
+            )
+            entries.append((email_keys, id_keys, entry))
+
+    return entries
+
+
+def _load_student_directory():
+    """Loader for the student directory: scan every non-output sheet once"""
+    backend = get_sheets_backend()
+    sheets = get_sheets_list(backend, SPREADSHEET_ID)
+
+    sheet_rows = fetch_planned(backend, SPREADSHEET_ID, candidate_sheets(sheets))
+
+    return sheets, _directory_entries(sheet_rows)
+
+
+# Shared by every request in this worker process
+student_directory = StudentDirectory(_load_student_directory)
+
+
+def find_student_in_sheets(backend, spreadsheet_id, student_email=None, student_id=None, sheet_rows=None):
+    """
+    Find student in the spreadsheet and return their row data and sheet info
+    Similar to PHP ad_get_student_components_internal logic
+
+    Served from the in-memory student directory when it is warm,
+    falling back to a live scan of the sheets on a miss.
+    A live scan fetches every candidate sheet in one batchGet; pass a dict as
+    `sheet_rows` to get those rows back for reuse.
+    """
+    if sheet_rows is None:
+        sheet_rows = {}
+
+    if not student_email and not student_id:
+        raise ValueError("Either student_email or student_id is required")
+    
+    # Normalize search terms
+    search_email = normalize_email(student_email) or None
+    search_id = normalize_id(student_id) or None
+    
+    entry = None
+    sheets = None
+    if spreadsheet_id == SPREADSHEET_ID:
+        entry = student_directory.lookup(search_email, search_id)
+        if entry is not None:
+            sheets = student_directory.sheets()
+    
+    if entry is None:
+        # Get all sheets
+        sheets = get_sheets_list(backend, spreadsheet_id)
+        sheet_rows.update(fetch_planned(backend, spreadsheet_id, candidate_sheets(sheets)))
+        entry = _search_sheets(sheets, sheet_rows, search_email, search_id)
         
-        if found_data:
-            break
+        if entry is not None and spreadsheet_id == SPREADSHEET_ID:
+            student_directory.remember(entry, search_email, search_id)
     
-    if not found_data:
+    if entry is None:
         # Provide more helpful error message
-        sheets_searched = [s['title'] for s in sheets if 'output' not in s['title'].lower()]
+        sheets_searched = candidate_sheets(sheets)
         raise ValueError(
             f"Student not found in any sheet. "
             f"Searched for email='{student_email}' or id='{student_id}'. "
             f"Sheets searched: {', '.join(sheets_searched[:5])}..."
         )
     
+    found_data = {
+        'row': entry.row,
+        'row_index': entry.row_index,
+        'sheet_title': entry.sheet_title
+    }
+    
     # Get group from column 4 (index 4)
-    group = found_data['row'][4] if len(found_data['row']) > 4 else None
+    group = entry.group
     
     if not group:
         raise ValueError("Group not found for student")
     
     # Get target sheet based on group mapping
-    target_sheet_name = GROUP_SHEET_MAPPING.get(group)
-    
-    if not target_sheet_name:
-        # If no mapping exists, try using the group name directly as sheet name
-        target_sheet_name = group
+    target_sheet_name = target_sheet_for_group(group)
     
     # Verify target sheet exists
     target_exists = any(s['title'] == target_sheet_name for s in sheets)
     if not target_exists:
-        available_sheets = [s['title'] for s in sheets if 'output' not in s['title'].lower()]
+        available_sheets = candidate_sheets(sheets)
         raise ValueError(
             f"Target sheet '{target_sheet_name}' for group '{group}' not found. "
             f"Available sheets: {', '.join(available_sheets[:10])}"
@@ -215,48 +211,33 @@ def find_student_in_sheets(service, spreadsheet_id, student_email=None, student_
     }
 
 
-def get_student_components(service, spreadsheet_id, student_email=None, student_id=None):
+def get_student_components(backend, spreadsheet_id, student_email=None, student_id=None):
     """
     Main function to get student components from Google Sheets
     Returns component name and evidence data
     """
     # Find student and get group/target sheet
-    student_info = find_student_in_sheets(service, spreadsheet_id, student_email, student_id)
+    # A live scan hands back the rows it fetched so the target sheet isn't read twice
+    sheet_rows = {}
+    student_info = find_student_in_sheets(
+        backend, spreadsheet_id, student_email, student_id, sheet_rows=sheet_rows
+    )
     
     target_sheet = student_info['target_sheet']
     student_email_found = student_info['student_email']
     student_id_found = student_info['student_id']
     
-    # Fetch target sheet data
-    range_name = f"{target_sheet}!A:Z"
-    rows = get_sheet_data(service, spreadsheet_id, range_name)
+    # Fetch target sheet data (already in hand after a live scan)
+    rows = sheet_rows.get(target_sheet)
+    if rows is None:
+        rows = fetch_planned(backend, spreadsheet_id, [target_sheet])[target_sheet]
     
     if not rows:
         raise ValueError(f"No data in target sheet: {target_sheet}")
     
-    # Detect component column index (search for 'component' in header)
-    component_index = None
-    evidence_index = None
-    
-    if rows and len(rows) > 0:
-        header_row = rows[0]
-        for idx, cell in enumerate(header_row):
-            if isinstance(cell, str) and 'component' in cell.lower():
-                component_index = idx
-            if isinstance(cell, str) and 'evidence' in cell.lower():
-                evidence_index = idx
-    
-    if component_index is None:
-        component_index = 3  # Default fallback
-    
-    if evidence_index is None:
-        evidence_index = 4  # Default fallback
-    
-    # Determine starting row (skip header if it contains 'component')
-    start_row = 0
-    if rows and len(rows) > 0 and component_index < len(rows[0]):
-        if isinstance(rows[0][component_index], str) and 'component' in rows[0][component_index].lower():
-            start_row = 1
+    # Component / evidence columns and the header row, from the schema cache
+    schema = schema_for(target_sheet, rows)
+    component_index, evidence_index, start_row = schema.component_index, schema.evidence_index, schema.start_row
     
     # Find the student's row in target sheet
     component_name = None
@@ -292,16 +273,7 @@ def get_student_components(service, spreadsheet_id, student_email=None, student_
     if not component_name:
         raise ValueError("Component data not found for student in target sheet")
     
-    # Parse component JSON if it's a JSON string
-    components_parsed = None
-    if isinstance(component_name, str):
-        try:
-            components_parsed = json.loads(component_name)
-        except:
-            # Not JSON, keep as string
-            components_parsed = component_name
-    else:
-        components_parsed = component_name
+    components_parsed = parse_component_cell(component_name)
     
     return {
         'student_id': student_id_found,
@@ -314,12 +286,148 @@ def get_student_components(service, spreadsheet_id, student_email=None, student_
     }
 
 
+def _target_row_index(rows, start_row):
+    """First target-sheet row per email (column B) and per ID (column A)"""
+    by_email = {}
+    by_id = {}
+    for i in range(start_row, len(rows)):
+        row = rows[i]
+        if len(row) < 2:
+            continue
+        if isinstance(row[1], str):
+            by_email.setdefault(row[1].lower().strip(), i)
+        by_id.setdefault(str(row[0]).strip(), i)
+    return by_email, by_id
+
+
+def get_students_components(backend, spreadsheet_id, students):
+    """
+    get_student_components() for many students from a single set of reads
+    `students` is a list of (student_email, student_id) pairs. Every
+    candidate sheet is fetched once and indexed; each target sheet is indexed
+    once for all students that map to it. Returns one
+    {'success': True, 'data': ...} or {'success': False, 'error': ...}
+    per student, in order.
+    """
+    sheets = get_sheets_list(backend, spreadsheet_id)
+    sheet_rows = fetch_planned(backend, spreadsheet_id, candidate_sheets(sheets))
+    sheet_titles = {s['title'] for s in sheets}
+
+    directory = StudentDirectory(lambda: (sheets, _directory_entries(sheet_rows)))
+    directory.rebuild()
+
+    target_indexes = {}  # target sheet -> (component_index, evidence_index, by_email, by_id)
+
+    def resolve(student_email, student_id):
+        entry = directory.lookup(student_email, student_id)
+        if entry is None:
+            raise ValueError(
+                f"Student not found in any sheet. "
+                f"Searched for email='{student_email}' or id='{student_id}'"
+            )
+
+        group = entry.group
+        if not group:
+            raise ValueError("Group not found for student")
+
+        target_sheet = target_sheet_for_group(group)
+        if target_sheet not in sheet_titles:
+            raise ValueError(f"Target sheet '{target_sheet}' for group '{group}' not found")
+
+        if target_sheet not in target_indexes:
+            rows = sheet_rows.get(target_sheet) or []
+            if not rows:
+                raise ValueError(f"No data in target sheet: {target_sheet}")
+            schema = schema_for(target_sheet, rows)
+            target_indexes[target_sheet] = (
+                schema.component_index, schema.evidence_index, *_target_row_index(rows, schema.start_row)
+            )
+        component_index, evidence_index, by_email, by_id = target_indexes[target_sheet]
+
+        student_email_found = entry.row[1] if len(entry.row) > 1 else ''
+        student_id_found = entry.row[0] if len(entry.row) > 0 else ''
+
+        # Earliest row matching either the email or the ID, like the single lookup
+        matches = []
+        if student_email_found and isinstance(student_email_found, str):
+            matches.append(by_email.get(student_email_found.lower().strip()))
+        if student_id_found and str(student_id_found).strip():
+            matches.append(by_id.get(str(student_id_found).strip()))
+        matches = [i for i in matches if i is not None]
+
+        component_name = None
+        evidence_data = None
+        if matches:
+            row = sheet_rows[target_sheet][min(matches)]
+            if component_index < len(row):
+                component_name = row[component_index]
+            if evidence_index < len(row):
+                evidence_data = row[evidence_index]
+
+        if not component_name:
+            raise ValueError("Component data not found for student in target sheet")
+
+        return {
+            'student_id': student_id_found,
+            'student_email': student_email_found,
+            'group': group,
+            'target_sheet': target_sheet,
+            'components': parse_component_cell(component_name),
+            'evidence': evidence_data,
+            'raw_component_name': component_name
+        }
+
+    results = []
+    for student_email, student_id in students:
+        try:
+            results.append({'success': True, 'data': resolve(student_email, student_id)})
+        except ValueError as e:
+            results.append({'success': False, 'error': str(e)})
+
+    return results
+
+
+def _evidence_options(params):
+    """
+    Structured-evidence options from query params, or None for the raw cell
+    evidence_format=structured [&status=A,B] [&component_id=] [&page=] [&page_size=]
+    """
+    if params.get('evidence_format') != 'structured':
+        return None
+    
+    statuses = [value for raw in params.getlist('status') for value in raw.split(',') if value.strip()]
+    page = int(params.get('page') or 1)
+    page_size = int(params.get('page_size') or 0) or None
+    if page < 1 or (page_size is not None and page_size < 1):
+        raise ValueError('page and page_size must be positive')
+    
+    max_page_size = getattr(settings, 'EVIDENCE_PAGE_SIZE_MAX', 500)
+    return {
+        'status': [value.strip() for value in statuses] or None,
+        'component_id': params.get('component_id', '').strip() or None,
+        'page': page,
+        'page_size': min(page_size, max_page_size) if page_size else None,
+    }
+
+
+def _components_etag(result, evidence_options):
+    """Hash of a mirror revision or get_student_components() result plus the evidence options"""
+    payload = json.dumps([result, evidence_options], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
 class GetStudentComponentsView(APIView):
     """
     API endpoint to fetch student components from Google Sheets
     GET /api/accounts/student-components/?student_email=xxx@xxx.com
     or
     GET /api/accounts/student-components/?student_id=1234
+    Add evidence_format=structured to get the evidence parsed and grouped
+    by component ('evidence_parsed') instead of the raw cell, optionally
+    filtered with status= / component_id= and paged with page= / page_size=
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    While the mirror is fresh and has the student, the ETag follows the
+    mirrored rows and is checked before anything else is read
     """
     permission_classes = [IsAuthenticated]
     
@@ -334,22 +442,66 @@ class GetStudentComponentsView(APIView):
             )
         
         try:
-            # Get authenticated Sheets service
-            service = get_sheets_service()
-            
-            # Fetch student components
-            result = get_student_components(
-                service,
-                SPREADSHEET_ID,
-                student_email=student_email if student_email else None,
-                student_id=student_id if student_id else None
+            evidence_options = _evidence_options(request.GET)
+        except ValueError:
+            return Response(
+                {'error': 'page and page_size must be positive integers'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        try:
+            # Served from the database mirror while it is fresh; a stale
+            # mirror is refreshed in the background and live Sheets answers
+            fresh = mirror_is_fresh()
+            if not fresh:
+                sync_mirror_in_background()
             
-            return Response({
-                'success': True,
-                'data': result
-            })
+            # While the mirror is fresh it serves the body, so the validator
+            # comes from the mirrored rows and an unchanged student costs a
+            # 304 and no parsing or transfer; a stale mirror may be behind
+            # Sheets, so then the live result is validated by content
+            if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+            revision = mirror_revision(student_email, student_id) if fresh else None
+            etag = quote_etag(_components_etag(revision, evidence_options)) if revision else None
+            not_modified = etag is not None and (etag in if_none_match or '*' in if_none_match)
+            
+            if not not_modified:
+                result = None
+                if fresh:
+                    result = get_mirrored_components(student_email, student_id)
+                
+                if result is None:
+                    result = get_student_components(
+                        get_sheets_backend(),
+                        SPREADSHEET_ID,
+                        student_email=student_email if student_email else None,
+                        student_id=student_id if student_id else None
+                    )
+                
+                if etag is None:
+                    etag = quote_etag(_components_etag(result, evidence_options))
+                    not_modified = etag in if_none_match or '*' in if_none_match
+            
+            if not_modified:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                if evidence_options is not None:
+                    result = structure_evidence(result, **evidence_options)
+                response = Response({
+                    'success': True,
+                    'data': result
+                })
+            
+            response['ETag'] = etag
+            # Browsers keep the body but always revalidate it
+            response['Cache-Control'] = 'private, no-cache'
+            return response
             
+        except SheetsUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e)},
@@ -362,16 +514,113 @@ class GetStudentComponentsView(APIView):
             )
 
 
+class BatchStudentComponentsView(APIView):
+    """
+    API endpoint to fetch components for many students at once
+    POST /api/accounts/student-components/batch/
+    Body: {"students": [{"student_email": "..."}, {"student_id": "..."}, ...]}
+      or  {"student_emails": [...], "student_ids": [...]}
+      plus "evidence_format": "structured" for parsed, grouped evidence
+    Returns one result per student, in request order, with per-student errors
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        students = []
+        for item in request.data.get('students') or []:
+            if isinstance(item, dict):
+                students.append((
+                    str(item.get('student_email') or '').strip(),
+                    str(item.get('student_id') or '').strip(),
+                ))
+        students += [(str(email).strip(), '') for email in request.data.get('student_emails') or []]
+        students += [('', str(student_id).strip()) for student_id in request.data.get('student_ids') or []]
+
+        if not students:
+            return Response(
+                {'error': 'Provide students, student_emails or student_ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_students = getattr(settings, 'STUDENT_COMPONENTS_BATCH_MAX', 200)
+        if len(students) > max_students:
+            return Response(
+                {'error': f'At most {max_students} students per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(students)
+        for position, (student_email, student_id) in enumerate(students):
+            if not student_email and not student_id:
+                results[position] = {'success': False, 'error': 'Either student_email or student_id is required'}
+
+        try:
+            # Mirror first while it is fresh; whatever it misses comes from
+            # one live read of the spreadsheet
+            if mirror_is_fresh():
+                for position, (student_email, student_id) in enumerate(students):
+                    if results[position] is None:
+                        data = get_mirrored_components(student_email, student_id)
+                        if data is not None:
+                            results[position] = {'success': True, 'data': data}
+            else:
+                sync_mirror_in_background()
+
+            missing = [position for position, result in enumerate(results) if result is None]
+            if missing:
+                live = get_students_components(
+                    get_sheets_backend(),
+                    SPREADSHEET_ID,
+                    [students[position] for position in missing]
+                )
+                for position, result in zip(missing, live):
+                    results[position] = result
+
+        except SheetsUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to fetch student components: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        if request.data.get('evidence_format') == 'structured':
+            for result in results:
+                if result.get('success'):
+                    result['data'] = structure_evidence(result['data'])
+        
+        return Response({
+            'success': True,
+            'data': [
+                {'student_email': student_email, 'student_id': student_id, **result}
+                for (student_email, student_id), result in zip(students, results)
+            ]
+        })
+
+
 class MarkEvidenceView(APIView):
     """
     API endpoint to mark evidence by submitting to processing sheet
-    and waiting for results from output sheet
+    The result is collected from the output sheet by a background job
+    POST /api/accounts/mark-evidence/  -> 202 {"job_id": ..., "status_url": ..., "events_url": ...}
+    Evidence that was already marked gets its stored result back (200)
+    unless "remark": true is sent
+    A request for evidence that is already being marked, or a repeated
+    Idempotency-Key header, gets the existing job back instead of a new one
     """
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
         """
-        Mark evidence - submit to processing sheet and poll for results
+        Mark evidence - queue a marking job and return straight away
         
         Expected payload:
         {
@@ -384,21 +633,15 @@ class MarkEvidenceView(APIView):
             "evidence_status": "PendingAssessment",
             "evidence_created_date": "2025-11-16T15:46:14.556909Z",
             "component_id": 19129,
-            "components": [{"componentId": 19129, "componentName": "Managing Portfolios"}]
+            "components": [{"componentId": 19129, "componentName": "Managing Portfolios"}],
+            "remark": false
         }
         """
         # Extract data from request
         student_id = request.data.get('student_id')
-        student_email = request.data.get('student_email')
-        student_name = request.data.get('student_name', student_email)
         group = request.data.get('group')
         evidence_id = request.data.get('evidence_id')
-        evidence_name = request.data.get('evidence_name')
-        evidence_url = request.data.get('evidence_url')
-        evidence_status = request.data.get('evidence_status')
-        evidence_created_date = request.data.get('evidence_created_date')
         component_id = request.data.get('component_id')
-        components = request.data.get('components', [])
         
         # Validate required fields
         if not all([student_id, group, evidence_id, component_id]):
@@ -408,144 +651,512 @@ class MarkEvidenceView(APIView):
             )
         
         try:
-            # Get authenticated Sheets service
-            service = get_sheets_service()
-            
-            # Find component name from components array
-            component_name = "Unknown Component"
-            if isinstance(components, list):
-                for comp in components:
-                    comp_id = comp.get('componentId') or comp.get('ComponentId')
-                    comp_name = comp.get('componentName') or comp.get('ComponentName')
-                    if comp_id == component_id and comp_name:
-                        component_name = comp_name
-                        break
-            elif isinstance(components, str):
-                # Try to parse if it's a JSON string
-                try:
-                    components_list = json.loads(components)
-                    for comp in components_list:
-                        comp_id = comp.get('componentId') or comp.get('ComponentId')
-                        comp_name = comp.get('componentName') or comp.get('ComponentName')
-                        if comp_id == component_id and comp_name:
-                            component_name = comp_name
-                            break
-                except:
-                    pass
+            if not request.data.get('remark'):
+                cached = latest_marking_result(group, evidence_id)
+                if cached is not None:
+                    return Response(serialize_result(cached))
             
-            # Get processing sheet name
-            processing_sheet = f"{group} processing sheet"
+            job, created = submit_marking_job(
+                request.user,
+                student_id,
+                group,
+                evidence_id,
+                build_processing_row(request.data),
+                idempotency_key=request.headers.get('Idempotency-Key', '').strip()[:255],
+            )
             
-            # Prepare row data for processing sheet
-            # Columns: UserId, UserName, ComponentId, ComponentName, EvidenceId, 
-            #          EvidenceName, EvidenceUrl, EvidenceStatus, EvidenceCreatedDate
-            row_data = [
-                str(student_id),
-                str(student_name),
-                str(component_id),
-                str(component_name),
-                str(evidence_id),
-                str(evidence_name),
-                str(evidence_url),
-                str(evidence_status),
-                str(evidence_created_date),
-            ]
+            data = serialize_job(job)
+            data['status_url'] = f"{request.path}{job.pk}/"
+            data['events_url'] = _stream_url(request.path, job)
+            if not created:
+                data['deduplicated'] = True
             
-            # Append to processing sheet
-            append_range = f"'{processing_sheet}'!A:I"
-            body = {
-                'values': [row_data]
-            }
+            in_flight = job.status not in FINISHED_STATUSES
+            return Response(data, status=status.HTTP_202_ACCEPTED if in_flight else status.HTTP_200_OK)
             
-            result = service.spreadsheets().values().append(
-                spreadsheetId=SPREADSHEET_ID,
-                range=append_range,
-                valueInputOption='RAW',
-                insertDataOption='INSERT_ROWS',
-                body=body
-            ).execute()
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to mark evidence: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class MarkingResultsView(APIView):
+    """
+    API endpoint to read stored marking results, newest first
+    GET /api/accounts/mark-evidence/results/?evidence_id=15009[&group=PCP]
+    or
+    GET /api/accounts/mark-evidence/results/?student_id=1234[&group=PCP]
+    Add latest=1 to keep only the newest result per evidence
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        evidence_id = request.GET.get('evidence_id', '').strip()
+        student_id = request.GET.get('student_id', '').strip()
+        group = request.GET.get('group', '').strip()
+
+        if not evidence_id and not student_id:
+            return Response(
+                {'error': 'Either evidence_id or student_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = MarkingResult.objects.all()
+        if evidence_id:
+            results = results.filter(evidence_id=evidence_id)
+        if student_id:
+            results = results.filter(student_id=student_id)
+        if group:
+            results = results.filter(group=group)
+
+        results = list(results[:getattr(settings, 'MARKING_RESULTS_MAX', 500)])
+
+        if request.GET.get('latest') in ('1', 'true'):
+            newest = {}
+            for result in results:
+                newest.setdefault((result.group, result.evidence_id), result)
+            results = list(newest.values())
+
+        return Response({
+            'success': True,
+            'data': [serialize_result(result) for result in results]
+        })
+
+
+def _fresh_webhook_timestamp(timestamp):
+    """X-Marking-Timestamp is unix seconds, within MARKING_WEBHOOK_TOLERANCE of now"""
+    try:
+        timestamp = int(timestamp)
+    except (TypeError, ValueError):
+        return False
+    tolerance = getattr(settings, 'MARKING_WEBHOOK_TOLERANCE', 300)
+    return abs(time.time() - timestamp) <= tolerance
+
+
+def _valid_webhook_signature(body, timestamp, signature):
+    """
+    X-Marking-Signature is the hex HMAC-SHA256 of "<timestamp>." followed by
+    the raw body, keyed with MARKING_WEBHOOK_SECRET; signing the timestamp
+    keeps a captured request from being replayed later
+    """
+    secret = getattr(settings, 'MARKING_WEBHOOK_SECRET', '')
+    if not secret or not signature or not timestamp:
+        return False
+    if signature.startswith('sha256='):
+        signature = signature[len('sha256='):]
+    expected = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+class MarkingOutputWebhookView(APIView):
+    """
+    Ingest endpoint for the spreadsheet's automation: finished output rows
+    are pushed here as soon as the marking engine writes them
+    POST /api/accounts/mark-evidence/output/
+    Headers: X-Marking-Timestamp: <unix seconds>
+             X-Marking-Signature: sha256=<hex HMAC-SHA256 of "<timestamp>.<body>">
+    Body: {"group": "PCP", "headers": [...], "rows": [[...], ...]}
+      ("sheet": "PCP Output" may be sent instead of "group")
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        # Signature covers the raw bytes, so read them before DRF parses the body
+        body = request.body
+        timestamp = request.headers.get('X-Marking-Timestamp', '').strip()
+        if not _valid_webhook_signature(body, timestamp, request.headers.get('X-Marking-Signature', '')):
+            return Response(
+                {'error': 'Invalid signature'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not _fresh_webhook_timestamp(timestamp):
+            return Response(
+                {'error': 'Stale timestamp'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Body must be a JSON object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        group = request.data.get('group')
+        sheet = request.data.get('sheet') or ''
+        if not group and sheet.endswith(' Output'):
+            group = sheet[:-len(' Output')]
+
+        headers = request.data.get('headers')
+        rows = request.data.get('rows')
+        if rows is None and request.data.get('row') is not None:
+            rows = [request.data.get('row')]
+
+        if not group or not isinstance(headers, list) or not isinstance(rows, list):
+            return Response(
+                {'error': 'Missing required fields: group, headers, rows'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        completed = []
+        errors = []
+        for idx, row in enumerate(rows):
+            try:
+                if not isinstance(row, list):
+                    raise ValueError("Row must be a list")
+                job = ingest_output_row(str(group), headers, row)
+                if job is not None:
+                    completed.append(str(job.pk))
+            except ValueError as e:
+                errors.append({'row': idx, 'error': str(e)})
+            except Exception as e:
+                errors.append({'row': idx, 'error': f'Failed to ingest row: {str(e)}'})
+
+        return Response({
+            'success': not errors,
+            'received': len(rows),
+            'completed_jobs': completed,
+            'errors': errors,
+        })
+
+
+def _visible_jobs(user):
+    """QA can see every job, coaches their own and the ones they follow"""
+    jobs = MarkingJob.objects.all()
+    role = getattr(getattr(user, 'profile', None), 'role', None)
+    if role != 'qa':
+        jobs = jobs.filter(Q(user=user) | Q(followers=user)).distinct()
+    return jobs
+
+
+class MarkingJobView(APIView):
+    """
+    API endpoint to check a marking job
+    GET /api/accounts/mark-evidence/<job_id>/
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, job_id):
+        job = get_object_or_404(_visible_jobs(request.user), pk=job_id)
+        # Pollers of a job lost with the queue get "timeout" instead of waiting forever
+        expire_orphaned_job(job)
+        return Response(serialize_job(job))
+
+
+# SSE event name for each job status
+JOB_EVENT_NAMES = {
+    'pending': 'submitted',
+    'processing': 'processing',
+    'completed': 'result',
+    'timeout': 'timeout',
+    'failed': 'failed',
+}
+
+
+def _sse(data):
+    event = JOB_EVENT_NAMES.get(data.get('status'), 'message')
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+STREAM_TOKEN_SALT = 'accounts.marking-job-events'
+
+
+def _stream_url(jobs_path, job):
+    """
+    Events URL of a job, carrying a short-lived token for that job only:
+    the browser's EventSource cannot send headers, and an access token in
+    the query string would end up in proxy and access logs
+    """
+    token = signing.dumps(str(job.pk), salt=STREAM_TOKEN_SALT)
+    return f"{jobs_path}{job.pk}/events/?token={token}"
+
+
+def _valid_stream_token(token, job_id):
+    max_age = getattr(settings, 'MARKING_EVENTS_TOKEN_MAX_AGE', 60)
+    try:
+        return signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=max_age) == str(job_id)
+    except signing.BadSignature:
+        return False
+
+
+async def _job_event_stream(job_id):
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    
+    def listener(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    # Subscribe before reading the stored state so no change slips in between
+    marking_events.subscribe(job_id, listener)
+    try:
+        job = await MarkingJob.objects.aget(pk=job_id)
+        event = serialize_job(job)
+        yield _sse(event)
+        
+        keepalive = getattr(settings, 'MARKING_EVENTS_KEEPALIVE', 15)
+        while event['status'] not in FINISHED_STATUSES:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                # The job may be running in another worker process;
+                # fall back to the stored state
+                latest = serialize_job(await MarkingJob.objects.aget(pk=job_id))
+                if latest['status'] == event['status']:
+                    yield ": keepalive\n\n"
+                    continue
+                event = latest
             
-            # Poll output sheet for results
-            output_sheet = f"{group} Output"
-            max_polls = 20  # Poll for up to 60 seconds (20 * 3s)
-            poll_interval = 3  # seconds
+            yield _sse(event)
+    finally:
+        marking_events.unsubscribe(job_id, listener)
+
+
+async def marking_job_events(request, job_id):
+    """
+    Server-Sent Events stream of one marking job
+    GET /api/accounts/mark-evidence/<job_id>/events/?token=<stream token>
+    The URL comes from "events_url" of the mark response; its token is only
+    good for this job and for MARKING_EVENTS_TOKEN_MAX_AGE seconds.
+    Sends the current state, then "processing", and finally "result",
+    "timeout" or "failed" before closing. Idle streams only cost a pending
+    await under ASGI.
+    """
+    if not _valid_stream_token(request.GET.get('token', ''), job_id):
+        return JsonResponse({'detail': 'Unauthorized'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    exists = await MarkingJob.objects.filter(pk=job_id).aexists()
+    if not exists:
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    response = StreamingHttpResponse(_job_event_stream(job_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let Nginx buffer the stream
+    return response
+
+
+class BulkMarkEvidenceView(APIView):
+    """
+    API endpoint to mark many pieces of evidence for one student at once
+    POST /api/accounts/mark-evidence/bulk/  -> 202 {"batch_id": ...}
+    GET  /api/accounts/mark-evidence/bulk/<batch_id>/
+    Evidence already being marked is listed under "in_flight" instead of
+    being submitted again, and evidence that was already marked is listed
+    under "cached" with its stored result unless "remark": true is sent
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """
+        Queue marking jobs for a list of evidence items, or for every piece of
+        evidence of one component in a given status (read from the sheet)
+        
+        Expected payload:
+        {
+            "student_id": "...",
+            "student_email": "...",
+            "student_name": "...",
+            "group": "PCP",
+            "components": [{"componentId": 19129, "componentName": "Managing Portfolios"}],
+            "items": [
+                {"evidence_id": 15009, "evidence_name": "...", "evidence_url": "...",
+                 "evidence_status": "PendingAssessment", "evidence_created_date": "...",
+                 "component_id": 19129}
+            ],
+            "remark": false
+        }
+        or, instead of "items":
+        {
+            ...
+            "component_id": 19129,
+            "evidence_status": "PendingAssessment"
+        }
+        """
+        student_id = request.data.get('student_id')
+        student_email = request.data.get('student_email')
+        group = request.data.get('group')
+        items = request.data.get('items')
+        component_id = request.data.get('component_id')
+        
+        if not student_id or not group:
+            return Response(
+                {'error': 'Missing required fields: student_id, group'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if items is None and not component_id:
+            return Response(
+                {'error': 'Either items or component_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if items is not None and not isinstance(items, list):
+            return Response(
+                {'error': 'items must be a list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        student = {
+            'student_id': student_id,
+            'student_email': student_email,
+            'student_name': request.data.get('student_name', student_email),
+            'components': request.data.get('components', []),
+        }
+        
+        try:
+            if items is None:
+                items, components = self._component_items(
+                    student_email, student_id, component_id,
+                    request.data.get('evidence_status', 'PendingAssessment')
+                )
+                if not student['components']:
+                    student['components'] = components
+        except SheetsUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to load evidence: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        max_items = getattr(settings, 'MARKING_BULK_MAX_ITEMS', 200)
+        if len(items) > max_items:
+            return Response(
+                {'error': f'Too many items: at most {max_items} per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        missing = [
+            idx for idx, item in enumerate(items)
+            if not isinstance(item, dict) or not item.get('evidence_id') or not item.get('component_id')
+        ]
+        if missing:
+            return Response(
+                {'error': 'Every item needs evidence_id and component_id', 'invalid_items': missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not items:
+            return Response(
+                {'error': 'No evidence to mark'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            batch_id = uuid.uuid4()
             
-            marking_result = None
-            for poll_count in range(max_polls):
-                time.sleep(poll_interval)
-                
-                # Read output sheet
-                try:
-                    output_range = f"'{output_sheet}'!A:Z"
-                    output_result = service.spreadsheets().values().get(
-                        spreadsheetId=SPREADSHEET_ID,
-                        range=output_range
-                    ).execute()
-                    
-                    output_rows = output_result.get('values', [])
-                    if not output_rows:
-                        continue
-                    
-                    # First row is headers
-                    headers = output_rows[0] if output_rows else []
-                    
-                    # Find evidence_id column (usually column E - EvidenceId)
-                    evidence_id_col = -1
-                    for idx, header in enumerate(headers):
-                        if header.lower() in ['evidenceid', 'evidence_id', 'evidence id']:
-                            evidence_id_col = idx
-                            break
-                    
-                    if evidence_id_col == -1:
+            # Evidence already marked, being marked (or listed twice) is not
+            # appended again
+            remark = bool(request.data.get('remark'))
+            new_items = {}
+            in_flight = {}
+            cached = {}
+            for item in items:
+                evidence_id = str(item['evidence_id'])
+                if evidence_id in new_items or evidence_id in in_flight or evidence_id in cached:
+                    continue
+                if not remark:
+                    result = latest_marking_result(group, evidence_id)
+                    if result is not None:
+                        cached[evidence_id] = result
                         continue
-                    
-                    # Search for matching evidence_id in output sheet
-                    for row in output_rows[1:]:  # Skip header row
-                        if len(row) > evidence_id_col:
-                            row_evidence_id = str(row[evidence_id_col])
-                            if row_evidence_id == str(evidence_id):
-                                # Found result - build result object
-                                marking_result = {}
-                                for idx, header in enumerate(headers):
-                                    if idx < len(row):
-                                        marking_result[header] = row[idx]
-                                break
-                    
-                    if marking_result:
-                        break
-                        
-                except HttpError as e:
-                    # Output sheet might not exist yet
-                    if poll_count < max_polls - 1:
-                        continue
-                    else:
-                        raise
+                job = in_flight_job(group, evidence_id)
+                if job is not None:
+                    follow_marking_job(job, request.user)
+                    in_flight[evidence_id] = job
+                else:
+                    new_items[evidence_id] = item
             
-            if marking_result:
-                return Response({
-                    'success': True,
-                    'message': 'Evidence marked successfully',
-                    'data': marking_result
-                })
-            else:
-                return Response({
-                    'success': False,
-                    'message': 'Evidence submitted but marking result not ready yet. Please check later.',
-                    'data': {
-                        'submitted': True,
-                        'processing_sheet': processing_sheet,
-                        'output_sheet': output_sheet,
-                        'evidence_id': evidence_id
-                    }
-                })
+            with transaction.atomic():
+                jobs = MarkingJob.objects.bulk_create([
+                    MarkingJob(
+                        user=request.user,
+                        batch_id=batch_id,
+                        student_id=str(student_id),
+                        group=str(group),
+                        evidence_id=evidence_id,
+                        row=build_processing_row({**student, **item}),
+                    )
+                    for evidence_id, item in new_items.items()
+                ])
+                enqueue_marking_jobs(jobs)
+            
+            data = serialize_batch(batch_id, jobs)
+            if jobs:
+                data['status_url'] = f"{request.path}{batch_id}/"
+            
+            jobs_path = request.path.rsplit('bulk/', 1)[0]
+            data['in_flight'] = [
+                {
+                    **serialize_job(job),
+                    'status_url': f"{jobs_path}{job.pk}/",
+                    'events_url': _stream_url(jobs_path, job),
+                }
+                for job in in_flight.values()
+            ]
+            data['cached'] = [serialize_result(result) for result in cached.values()]
+            return Response(data, status=status.HTTP_202_ACCEPTED if jobs else status.HTTP_200_OK)
             
-        except HttpError as e:
+        except IntegrityError:
             return Response(
-                {'error': f'Google Sheets API error: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'Some of this evidence was submitted by another request at the same time, please retry'},
+                status=status.HTTP_409_CONFLICT
             )
         except Exception as e:
             return Response(
                 {'error': f'Failed to mark evidence: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    def _component_items(self, student_email, student_id, component_id, evidence_status):
+        """
+        Evidence items of one component in the given status, read from the
+        student's target sheet; returns (items, components)
+        """
+        result = get_student_components(
+            get_sheets_backend(),
+            SPREADSHEET_ID,
+            student_email=student_email or None,
+            student_id=student_id or None
+        )
+        
+        items = []
+        for evidence in parse_evidence_items(result['evidence']):
+            if str(evidence['componentId']) != str(component_id):
+                continue
+            if evidence_status and evidence['status'] != evidence_status:
+                continue
+            items.append({
+                'evidence_id': evidence['id'],
+                'evidence_name': evidence['name'],
+                'evidence_url': evidence['url'],
+                'evidence_status': evidence['status'],
+                'evidence_created_date': evidence['createdDate'],
+                'component_id': evidence['componentId'],
+            })
+        
+        return items, result['components']
+
+
+class MarkingBatchView(APIView):
+    """
+    API endpoint to check a bulk marking request
+    GET /api/accounts/mark-evidence/bulk/<batch_id>/
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, batch_id):
+        jobs = list(_visible_jobs(request.user).filter(batch_id=batch_id).order_by('created_at'))
+        if not jobs:
+            return Response({'error': 'Batch not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(serialize_batch(batch_id, jobs))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.evidence_mirror import sync_mirror
+
+
+class Command(BaseCommand):
+    help = 'Mirror student, group, component and evidence rows from the evidence spreadsheet into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and sync again every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            self.stdout.write("Syncing evidence mirror from Google Sheets...")
+            started = time.monotonic()
+
+            try:
+                stats = sync_mirror()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✓ {stats['sheets']} sheets in {time.monotonic() - started:.1f}s | "
+                        f"{stats['created']} created, {stats['updated']} updated, "
+                        f"{stats['unchanged']} unchanged, {stats['deleted']} deleted"
+                    )
+                )
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'Error: {e}')
+                )
+
+            if not interval:
+                break
+            time.sleep(interval)
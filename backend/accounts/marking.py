@@ -0,0 +1,534 @@
+"""
+Evidence marking jobs
+Worker threads append evidence rows to '<group> processing sheet'; the
+marking result is collected from '<group> Output' by the shared output
+pollers (or pushed by the output webhook)
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from googleapiclient.errors import HttpError
+
+from .marking_events import marking_events
+from .models import MarkingJob, MarkingResult
+from .output_pollers import get_output_poller, output_sheet_name, row_to_result
+from .processing_sheets import get_append_batcher, processing_sheet_name
+from .sheet_schemas import schema_cache, trim_row
+
+
+# Job states that won't change again
+FINISHED_STATUSES = ('completed', 'timeout', 'failed')
+
+# Job states that hold the evidence's single in-flight slot
+IN_FLIGHT_STATUSES = ('pending', 'processing')
+
+# Job states a result arriving from the output sheet can still complete
+RESOLVABLE_STATUSES = IN_FLIGHT_STATUSES + ('timeout',)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'MARKING_WORKERS', 4),
+            thread_name_prefix='marking'
+        )
+    return _executor
+
+
+def get_component_name(components, component_id):
+    """Find component name from components array (or its JSON string)"""
+    if isinstance(components, str):
+        # Try to parse if it's a JSON string
+        try:
+            components = json.loads(components)
+        except ValueError:
+            return "Unknown Component"
+
+    if isinstance(components, list):
+        for comp in components:
+            if not isinstance(comp, dict):
+                continue
+            comp_id = comp.get('componentId') or comp.get('ComponentId')
+            comp_name = comp.get('componentName') or comp.get('ComponentName')
+            if comp_id == component_id and comp_name:
+                return comp_name
+
+    return "Unknown Component"
+
+
+def build_processing_row(data):
+    """
+    Prepare row data for processing sheet
+    Columns: UserId, UserName, ComponentId, ComponentName, EvidenceId,
+             EvidenceName, EvidenceUrl, EvidenceStatus, EvidenceCreatedDate
+    """
+    student_email = data.get('student_email')
+    component_id = data.get('component_id')
+
+    return [
+        str(data.get('student_id')),
+        str(data.get('student_name', student_email)),
+        str(component_id),
+        str(get_component_name(data.get('components', []), component_id)),
+        str(data.get('evidence_id')),
+        str(data.get('evidence_name')),
+        str(data.get('evidence_url')),
+        str(data.get('evidence_status')),
+        str(data.get('evidence_created_date')),
+    ]
+
+
+def _set_status(job, status, **fields):
+    job.status = status
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=['status', 'updated_at', *fields.keys()])
+
+    # Push the change to anyone streaming this job
+    marking_events.publish(job.pk, serialize_job(job))
+
+
+def _fail(job, e):
+    if isinstance(e, HttpError):
+        _set_status(job, 'failed', error=f'Google Sheets API error: {str(e)}')
+    else:
+        _set_status(job, 'failed', error=f'Failed to mark evidence: {str(e)}')
+
+
+def save_marking_result(job, result):
+    """Keep the output row so the evidence doesn't have to be marked again"""
+    return MarkingResult.objects.create(
+        job=job,
+        student_id=job.student_id,
+        group=job.group,
+        evidence_id=job.evidence_id,
+        result=result,
+    )
+
+
+def complete_marking_job(job, result):
+    """
+    Record the job's result and store it, unless the job was completed
+    already (by the output poller or the output webhook, in any process)
+    Returns True when this call completed it
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = MarkingJob.objects.filter(pk=job.pk, status__in=RESOLVABLE_STATUSES).update(
+            status='completed', result=result, updated_at=now
+        )
+        if not claimed:
+            return False
+        save_marking_result(job, result)
+
+    job.status = 'completed'
+    job.result = result
+    job.updated_at = now
+    marking_events.publish(job.pk, serialize_job(job))
+    return True
+
+
+def _time_out(job):
+    """Give up on a job unless its result arrived some other way meanwhile"""
+    now = timezone.now()
+    if MarkingJob.objects.filter(pk=job.pk, status__in=IN_FLIGHT_STATUSES).update(status='timeout', updated_at=now):
+        job.status = 'timeout'
+        job.updated_at = now
+        marking_events.publish(job.pk, serialize_job(job))
+
+
+def latest_marking_result(group, evidence_id):
+    """Newest stored result for the evidence, or None"""
+    return MarkingResult.objects.filter(group=str(group), evidence_id=str(evidence_id)).first()
+
+
+def _start_processing(job, now):
+    """
+    pending -> processing, unless the result already came in (output rows can
+    land before the worker gets here)
+    """
+    if MarkingJob.objects.filter(pk=job.pk, status='pending').update(
+        status='processing', submitted_at=now, updated_at=now
+    ):
+        job.status = 'processing'
+        job.submitted_at = job.updated_at = now
+        marking_events.publish(job.pk, serialize_job(job))
+
+
+def marking_deadline():
+    """Seconds a submitted job waits for its output row before timing out"""
+    return getattr(settings, 'MARKING_MAX_POLLS', 20) * getattr(settings, 'MARKING_POLL_INTERVAL', 3)
+
+
+class MarkingDeadlines:
+    """
+    Submitted jobs of this process that still wait for their output row.
+    Results come in through the output pollers' callbacks (or the output
+    webhook); one sweeper thread drops jobs finished elsewhere and times out
+    the ones past their deadline. The thread starts with the first job and
+    exits once none are left.
+    """
+
+    def __init__(self, interval=None):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._jobs = {}  # job pk -> (job, callback, monotonic deadline)
+        self._thread = None
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, 'MARKING_POLL_INTERVAL', 3)
+
+    def add(self, job, callback, deadline):
+        with self._lock:
+            self._jobs[job.pk] = (job, callback, deadline)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='marking-deadlines', daemon=True)
+                self._thread.start()
+
+    def discard(self, job_pk):
+        """Stop waiting for the job's output row"""
+        with self._lock:
+            entry = self._jobs.pop(job_pk, None)
+        if entry is not None:
+            job, callback, _ = entry
+            get_output_poller(job.group).unsubscribe(job.evidence_id, callback)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._jobs:
+                    self._thread = None
+                    return
+
+            try:
+                self.sweep()
+            except Exception:
+                # Database hiccup; try again next tick
+                pass
+            finally:
+                close_old_connections()
+
+    def sweep(self):
+        with self._lock:
+            entries = list(self._jobs.values())
+        if not entries:
+            return
+
+        # Results pushed to the output webhook of another process
+        finished = set(MarkingJob.objects.filter(pk__in=[job.pk for job, _, _ in entries]).exclude(
+            status__in=IN_FLIGHT_STATUSES
+        ).values_list('pk', flat=True))
+
+        now = time.monotonic()
+        for job, _, deadline in entries:
+            if job.pk in finished:
+                self.discard(job.pk)
+            elif now >= deadline:
+                self.discard(job.pk)
+                _time_out(job)
+
+
+_deadlines = None
+_deadlines_lock = threading.Lock()
+
+
+def get_marking_deadlines():
+    """The process-wide deadline sweeper"""
+    global _deadlines
+    with _deadlines_lock:
+        if _deadlines is None:
+            _deadlines = MarkingDeadlines()
+        return _deadlines
+
+
+def _result_arrived(job, result):
+    """Output poller callback: runs on the poller's thread"""
+    close_old_connections()
+    try:
+        complete_marking_job(job, result)
+    finally:
+        get_marking_deadlines().discard(job.pk)
+
+
+def run_marking_jobs(job_ids):
+    """
+    Worker body: append the jobs' rows (one append per group) and hand the
+    jobs to their groups' output pollers. The worker is free again as soon
+    as the rows are written; results finish the jobs from the poller (or
+    webhook) and MarkingDeadlines times out the ones that never arrive
+    """
+    close_old_connections()
+    try:
+        # Jobs timed out while queued (see in_flight_job) are left alone
+        jobs = list(MarkingJob.objects.filter(pk__in=job_ids, status='pending').order_by('created_at'))
+        if not jobs:
+            return
+
+        by_group = {}
+        for job in jobs:
+            by_group.setdefault(job.group, []).append(job)
+
+        # Rows for the same group go out together, coalesced with any
+        # concurrent jobs into one append
+        deadlines = get_marking_deadlines()
+        for group, group_jobs in by_group.items():
+            # The group's shared poller reads the output sheet for every
+            # waiting job; subscribed before the append so no row is missed
+            poller = get_output_poller(group)
+            callbacks = {}
+            for job in group_jobs:
+                callbacks[job.pk] = (lambda result, job=job: _result_arrived(job, result))
+                poller.subscribe(job.evidence_id, callbacks[job.pk])
+
+            futures = get_append_batcher().submit_many(group, [job.row for job in group_jobs])
+            for job, future in zip(group_jobs, futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    poller.unsubscribe(job.evidence_id, callbacks[job.pk])
+                    _fail(job, e)
+                    continue
+
+                _start_processing(job, timezone.now())
+                deadlines.add(job, callbacks[job.pk], time.monotonic() + marking_deadline())
+
+    finally:
+        close_old_connections()
+
+
+def run_marking_job(job_id):
+    """Worker body for a single job"""
+    run_marking_jobs([job_id])
+
+
+def enqueue_marking_job(job):
+    """Hand the job to the worker pool once the creating transaction commits"""
+    transaction.on_commit(lambda: get_executor().submit(run_marking_job, job.pk))
+
+
+def enqueue_marking_jobs(jobs):
+    """Hand several jobs to one worker so their rows are appended together"""
+    job_ids = [job.pk for job in jobs]
+    transaction.on_commit(lambda: get_executor().submit(run_marking_jobs, job_ids))
+
+
+def _orphaned(job, now):
+    """
+    True for a job no worker is going to finish: still queued long after it
+    was created (the queue lives in memory and is lost on a restart or a
+    crashed worker), or still processing long after its polling deadline,
+    counted from when its row was appended
+    """
+    if job.status == 'pending':
+        age = now - job.created_at
+        limit = getattr(settings, 'MARKING_QUEUE_TIMEOUT', 600)
+    elif job.status == 'processing':
+        age = now - (job.submitted_at or job.updated_at)
+        limit = marking_deadline() + getattr(settings, 'MARKING_STALE_GRACE', 120)
+    else:
+        return False
+    return age.total_seconds() > limit
+
+
+def expire_orphaned_job(job):
+    """Time the job out if it was orphaned; True when it was"""
+    if not _orphaned(job, timezone.now()):
+        return False
+    _time_out(job)
+    return True
+
+
+def in_flight_job(group, evidence_id):
+    """
+    The job currently marking this evidence, or None
+    An orphaned job is timed out first so the evidence can be submitted again
+    """
+    job = MarkingJob.objects.filter(
+        group=str(group), evidence_id=str(evidence_id), status__in=IN_FLIGHT_STATUSES
+    ).first()
+    if job is None or expire_orphaned_job(job):
+        return None
+    return job
+
+
+def follow_marking_job(job, user):
+    """Let a user whose request was deduplicated onto someone else's job read it"""
+    if job.user_id != user.pk:
+        job.followers.add(user)
+
+
+def submit_marking_job(user, student_id, group, evidence_id, row, idempotency_key=''):
+    """
+    Create and queue a marking job, unless the same idempotency key was used
+    before or the evidence is already being marked
+    Returns (job, created); when created is False the job is the existing one,
+    which the user can now follow
+    """
+    def existing():
+        if idempotency_key:
+            job = MarkingJob.objects.filter(user=user, idempotency_key=idempotency_key).first()
+            if job is not None:
+                return job
+        return in_flight_job(group, evidence_id)
+
+    job = existing()
+    if job is not None:
+        follow_marking_job(job, user)
+        return job, False
+
+    try:
+        with transaction.atomic():
+            job = MarkingJob.objects.create(
+                user=user,
+                student_id=str(student_id),
+                group=str(group),
+                evidence_id=str(evidence_id),
+                idempotency_key=idempotency_key,
+                row=row,
+            )
+            enqueue_marking_job(job)
+    except IntegrityError:
+        # A concurrent request for the same evidence (or key) got in first
+        job = existing()
+        if job is None:
+            raise
+        follow_marking_job(job, user)
+        return job, False
+
+    return job, True
+
+
+def ingest_output_row(group, headers, row):
+    """
+    Take a finished row of '<group> Output' pushed by the spreadsheet
+    Completes the newest unfinished job for its evidence (or stores the
+    result on its own when no job is waiting) and wakes any worker in this
+    process waiting on it. Returns the completed job, or None.
+    A row that is pushed again (automation retries, replays) stores nothing new.
+    """
+    # Keep the shared output-sheet schema in step with what the sheet sends
+    title = output_sheet_name(group)
+    schema = schema_cache.current(title)
+    if schema is None or schema.header != trim_row(headers):
+        schema = schema_cache.set(title, headers)
+
+    evidence_id_col = schema.evidence_id_index
+    if evidence_id_col == -1 or evidence_id_col >= len(row) or not str(row[evidence_id_col]).strip():
+        raise ValueError("Row has no evidence id")
+
+    evidence_id = str(row[evidence_id_col]).strip()
+    result = row_to_result(headers, row)
+
+    completed = None
+    job = MarkingJob.objects.filter(
+        group=str(group), evidence_id=evidence_id, status__in=RESOLVABLE_STATUSES
+    ).order_by('-created_at').first()
+
+    if job is not None:
+        if complete_marking_job(job, result):
+            completed = job
+    elif not (
+        MarkingJob.objects.filter(group=str(group), evidence_id=evidence_id, status='completed').exists()
+        or MarkingResult.objects.filter(group=str(group), evidence_id=evidence_id, result=result).exists()
+    ):
+        # Marked outside the dashboard - keep the result for later reads
+        MarkingResult.objects.create(
+            student_id=str(result.get('UserId', '')),
+            group=str(group),
+            evidence_id=evidence_id,
+            result=result,
+        )
+
+    get_output_poller(group).resolve({evidence_id: result})
+    return completed
+
+
+def serialize_job(job):
+    """Job state in the shape the frontend expects from the mark endpoint"""
+    data = {
+        'job_id': str(job.pk),
+        'status': job.status,
+        'evidence_id': job.evidence_id,
+        'group': job.group,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+    if job.status == 'completed':
+        data.update({
+            'success': True,
+            'message': 'Evidence marked successfully',
+            'data': job.result,
+        })
+    elif job.status == 'timeout':
+        data.update({
+            'success': False,
+            'message': 'Evidence submitted but marking result not ready yet. Please check later.',
+            'data': {
+                'submitted': job.submitted_at is not None,
+                'processing_sheet': processing_sheet_name(job.group),
+                'output_sheet': output_sheet_name(job.group),
+                'evidence_id': job.evidence_id,
+            },
+        })
+    elif job.status == 'failed':
+        data.update({
+            'success': False,
+            'error': job.error,
+        })
+    else:
+        data.update({
+            'success': True,
+            'message': 'Evidence submitted for marking',
+        })
+
+    return data
+
+
+def serialize_batch(batch_id, jobs):
+    """Per-item progress for a bulk marking request"""
+    jobs = list(jobs)
+
+    counts = {}
+    for job in jobs:
+        counts[job.status] = counts.get(job.status, 0) + 1
+
+    finished = sum(counts.get(s, 0) for s in FINISHED_STATUSES)
+
+    return {
+        'batch_id': str(batch_id),
+        'total': len(jobs),
+        'finished': finished,
+        'done': finished == len(jobs),
+        'counts': counts,
+        'items': [serialize_job(job) for job in jobs],
+    }
+
+
+def serialize_result(result):
+    """A stored result in the shape of a completed job"""
+    return {
+        'job_id': str(result.job_id) if result.job_id else None,
+        'status': 'completed',
+        'evidence_id': result.evidence_id,
+        'student_id': result.student_id,
+        'group': result.group,
+        'marked_at': result.marked_at.isoformat() if result.marked_at else None,
+        'cached': True,
+        'success': True,
+        'message': 'Evidence already marked',
+        'data': result.result,
+    }
@@ -0,0 +1,45 @@
+"""
+In-process marking job events
+Marking workers publish every job status change here; the SSE endpoint
+subscribes per job and forwards the events to the browser
+"""
+import threading
+
+
+class MarkingEvents:
+    """
+    Fan-out of job events to listeners.
+    A listener is any callable taking the event dict; it is called from the
+    publishing (worker) thread, so async consumers should hand the event to
+    their loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}  # job_id -> [listener, ...]
+
+    def subscribe(self, job_id, listener):
+        with self._lock:
+            self._listeners.setdefault(str(job_id), []).append(listener)
+
+    def unsubscribe(self, job_id, listener):
+        key = str(job_id)
+        with self._lock:
+            listeners = self._listeners.get(key, [])
+            if listener in listeners:
+                listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(key, None)
+
+    def publish(self, job_id, event):
+        with self._lock:
+            listeners = list(self._listeners.get(str(job_id), []))
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                # A closed stream must not break the worker
+                pass
+
+
+marking_events = MarkingEvents()
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_markingjob_batch_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SheetSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sheet_title', models.CharField(max_length=255, unique=True)),
+                ('sheet_index', models.IntegerField(default=0)),
+                ('header', models.JSONField(default=list)),
+                ('row_count', models.IntegerField(default=0)),
+                ('revision', models.CharField(blank=True, default='', max_length=64)),
+                ('synced_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SheetRowMirror',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sheet_title', models.CharField(max_length=255)),
+                ('sheet_index', models.IntegerField(default=0)),
+                ('row_index', models.IntegerField()),
+                ('student_id', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('student_email', models.CharField(blank=True, db_index=True, default='', max_length=254)),
+                ('group', models.CharField(blank=True, default='', max_length=64)),
+                ('row', models.JSONField(default=list)),
+                ('row_hash', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sheet_title', 'student_email'], name='sheet_row_mirror_email_idx'), models.Index(fields=['sheet_title', 'student_id'], name='sheet_row_mirror_id_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sheet_title', 'row_index'), name='sheet_row_mirror_unique_row')],
+            },
+        ),
+    ]
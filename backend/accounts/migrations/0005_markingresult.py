@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_sheet_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarkingResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.CharField(db_index=True, max_length=64)),
+                ('group', models.CharField(max_length=64)),
+                ('evidence_id', models.CharField(max_length=64)),
+                ('result', models.JSONField(default=dict)),
+                ('marked_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results', to='accounts.markingjob')),
+            ],
+            options={
+                'ordering': ['-marked_at'],
+                'indexes': [models.Index(fields=['group', 'evidence_id', '-marked_at'], name='marking_result_evidence_idx'), models.Index(fields=['evidence_id'], name='marking_result_evidence_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+def time_out_duplicate_jobs(apps, schema_editor):
+    """Older duplicates of an in-flight job would break the new constraint"""
+    MarkingJob = apps.get_model('accounts', 'MarkingJob')
+    seen = set()
+    for job in MarkingJob.objects.filter(status__in=['pending', 'processing']).order_by('-created_at'):
+        key = (job.group, job.evidence_id)
+        if key in seen:
+            job.status = 'timeout'
+            job.save(update_fields=['status'])
+        seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_markingresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingjob',
+            name='idempotency_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(time_out_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='markingjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'processing'])), fields=('group', 'evidence_id'), name='marking_job_one_in_flight'),
+        ),
+        migrations.AddConstraint(
+            model_name='markingjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key', ''), _negated=True), fields=('user', 'idempotency_key'), name='marking_job_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_markingjob_idempotency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingjob',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
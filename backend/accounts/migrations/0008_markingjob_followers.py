@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_markingjob_submitted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markingjob',
+            name='followers',
+            field=models.ManyToManyField(blank=True, related_name='followed_marking_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
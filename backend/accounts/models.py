@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 # Create your models here.
@@ -18,3 +20,135 @@ class Profile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} ({self.role})"
+
+
+class MarkingJob(models.Model):
+    """
+    One evidence marking request
+    The row is appended to '<group> processing sheet' and the result is read
+    back from '<group> Output' by a background worker
+    """
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("completed", "Completed"),
+        ("timeout", "Timed out"),
+        ("failed", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="marking_jobs")
+    # other users whose requests for the same evidence were deduplicated onto
+    # this job; they can follow it like their own
+    followers = models.ManyToManyField(User, blank=True, related_name="followed_marking_jobs")
+
+    # set when the job was submitted as part of a bulk marking request
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+
+    student_id = models.CharField(max_length=64)
+    group = models.CharField(max_length=64)
+    evidence_id = models.CharField(max_length=64, db_index=True)
+
+    # client-supplied Idempotency-Key header, unique per user when set
+    idempotency_key = models.CharField(max_length=255, blank=True, default="")
+
+    # row appended to the processing sheet
+    row = models.JSONField(default=list)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # when the row was appended to the processing sheet (start of 'processing')
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            # at most one job in flight per piece of evidence
+            models.UniqueConstraint(
+                fields=["group", "evidence_id"],
+                condition=models.Q(status__in=["pending", "processing"]),
+                name="marking_job_one_in_flight",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                condition=~models.Q(idempotency_key=""),
+                name="marking_job_idempotency_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.group} evidence {self.evidence_id} ({self.status})"
+
+
+class MarkingResult(models.Model):
+    """
+    A marking result read back from '<group> Output'
+    Every completed job adds one; the newest per (group, evidence_id) is
+    what the mark endpoint hands back instead of re-submitting
+    """
+    job = models.ForeignKey(MarkingJob, on_delete=models.SET_NULL, null=True, blank=True, related_name="results")
+
+    student_id = models.CharField(max_length=64, db_index=True)
+    group = models.CharField(max_length=64)
+    evidence_id = models.CharField(max_length=64)
+
+    # output sheet row keyed by its headers
+    result = models.JSONField(default=dict)
+
+    marked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-marked_at"]
+        indexes = [
+            models.Index(fields=["group", "evidence_id", "-marked_at"], name="marking_result_evidence_idx"),
+            models.Index(fields=["evidence_id"], name="marking_result_evidence_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.group} evidence {self.evidence_id} result"
+
+
+class SheetSyncState(models.Model):
+    """Last mirror sync of one sheet of the evidence spreadsheet"""
+    sheet_title = models.CharField(max_length=255, unique=True)
+    sheet_index = models.IntegerField(default=0)
+    header = models.JSONField(default=list)
+    row_count = models.IntegerField(default=0)
+
+    # hash over every row hash - changes whenever any row of the sheet changes
+    revision = models.CharField(max_length=64, blank=True, default="")
+    synced_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.sheet_title} @ {self.synced_at}"
+
+
+class SheetRowMirror(models.Model):
+    """Mirror of one student row of the evidence spreadsheet"""
+    sheet_title = models.CharField(max_length=255)
+    sheet_index = models.IntegerField(default=0)
+    row_index = models.IntegerField()
+
+    student_id = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    student_email = models.CharField(max_length=254, blank=True, default="", db_index=True)
+    group = models.CharField(max_length=64, blank=True, default="")
+
+    row = models.JSONField(default=list)
+    row_hash = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sheet_title", "row_index"], name="sheet_row_mirror_unique_row"),
+        ]
+        indexes = [
+            models.Index(fields=["sheet_title", "student_email"], name="sheet_row_mirror_email_idx"),
+            models.Index(fields=["sheet_title", "student_id"], name="sheet_row_mirror_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.sheet_title}#{self.row_index} {self.student_email or self.student_id}"
@@ -0,0 +1,241 @@
+"""
+Shared output-sheet pollers
+One poller per group reads '<group> Output' once per tick and resolves
+every evidence_id waiting on that group from the same read
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from googleapiclient.errors import HttpError
+
+from .sheet_schemas import schema_cache
+from .sheets import SPREADSHEET_ID, column_letter, sheet_range
+from .sheets_backends import get_sheets_backend
+
+
+def output_sheet_name(group):
+    return f"{group} Output"
+
+
+def row_to_result(headers, row):
+    """Build result object keyed by output sheet headers"""
+    return {header: row[idx] for idx, header in enumerate(headers) if idx < len(row)}
+
+
+class OutputSheetPoller:
+    """
+    Polls one group's output sheet while anyone is waiting on it.
+    The thread starts with the first waiter and exits once none are left.
+    """
+
+    def __init__(self, group, interval=None):
+        self.group = group
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._waiters = {}  # evidence_id -> [callback, ...]
+        self._thread = None
+
+        # Tail-read state for the output sheet
+        self._read_lock = threading.Lock()
+        self._schema = None  # SheetSchema of the output sheet
+        self._next_row = 1  # 1-based sheet row of the next unread row
+        self._primed = False  # cursor moved past the rows that were there before
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        # With the output webhook pushing results, polling is only a safety
+        # net for rows the webhook missed
+        if getattr(settings, 'MARKING_WEBHOOK_SECRET', ''):
+            return getattr(settings, 'MARKING_WEBHOOK_POLL_INTERVAL', 15)
+        return getattr(settings, 'MARKING_POLL_INTERVAL', 3)
+
+    def subscribe(self, evidence_id, callback):
+        """
+        Call `callback(result)` once a result row for evidence_id shows up.
+        Subscribe before submitting: a cold poller moves its cursor to the end
+        of the sheet here, so only rows appended from now on are handed out
+        """
+        key = str(evidence_id)
+        with self._lock:
+            self._waiters.setdefault(key, []).append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f'output-poller-{self.group}', daemon=True
+                )
+                self._thread.start()
+
+        # Primed only once the waiter is in, so the thread can't go idle
+        # (and unprime) in between
+        try:
+            self.prime()
+        except Exception:
+            # Sheets had a hiccup; the first tick primes instead
+            pass
+
+    def unsubscribe(self, evidence_id, callback):
+        key = str(evidence_id)
+        with self._lock:
+            callbacks = self._waiters.get(key, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._waiters.pop(key, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._waiters:
+                    self._thread = None
+                    # Rows appended while idle belong to nobody; the next
+                    # subscriber primes from the end of the sheet again
+                    with self._read_lock:
+                        self._primed = False
+                    return
+
+            try:
+                self.poll_once()
+            except Exception:
+                # Output sheet might not exist yet, or Sheets had a hiccup;
+                # try again next tick
+                pass
+
+    def _current_schema(self, backend, title):
+        """
+        Follow the shared schema cache: a header change seen elsewhere (the
+        output webhook, another read) is adopted without moving the cursor;
+        an invalidated entry is refreshed from the header row alone
+        """
+        cached = schema_cache.current(title)
+        if cached is None:
+            header_rows = backend.get(SPREADSHEET_ID, sheet_range(title, 'A1:Z1'))
+            cached = schema_cache.set(title, header_rows[0] if header_rows else [])
+        return cached
+
+    def prime(self):
+        """Move the cursor past the rows already in the sheet, once per busy spell"""
+        with self._read_lock:
+            if not self._primed:
+                self._prime()
+
+    def _prime(self):
+        backend = get_sheets_backend()
+        title = output_sheet_name(self.group)
+        try:
+            rows = backend.get(SPREADSHEET_ID, sheet_range(title, 'A1:Z'))
+        except HttpError:
+            # Output sheet doesn't exist yet, so every row it gets is new
+            rows = []
+
+        if rows:
+            # Rows come back up to the last non-blank one, header included
+            self._schema = schema_cache.set(title, rows[0])
+            self._next_row = len(rows) + 1
+        else:
+            self.reset()
+        self._primed = True
+
+    def read_results(self):
+        """
+        Read rows appended to the output sheet since the last tick and
+        return them as an evidence_id -> result map.
+        Rows that were there before the poller was primed are old results
+        for earlier submissions and are never returned; after that, reads
+        fetch from the remembered cursor, using the column layout from the
+        sheet schema cache.
+        """
+        with self._read_lock:
+            if not self._primed:
+                # Only reached when priming at subscribe time failed
+                self._prime()
+                return {}
+
+            backend = get_sheets_backend()
+            title = output_sheet_name(self.group)
+            try:
+                if self._schema:
+                    self._schema = self._current_schema(backend, title)
+
+                first_row = self._next_row if self._schema else 1
+                # After the header is known only its columns are read
+                last_column = column_letter(len(self._schema.header) - 1) if self._schema else 'Z'
+                rows = backend.get(
+                    SPREADSHEET_ID,
+                    sheet_range(title, f'A{first_row}:{last_column}')
+                )
+            except HttpError:
+                # Output sheet might not exist yet, or was cut below the
+                # cursor - start again from the header next time
+                self.reset()
+                return {}
+
+            if not self._schema:
+                if not rows:
+                    return {}
+
+                # First row is headers
+                schema = schema_cache.set(title, rows[0])
+                if schema.evidence_id_index == -1:
+                    return {}
+
+                self._schema = schema
+                self._next_row = 2
+                rows = rows[1:]
+
+            headers = self._schema.header
+            evidence_id_col = self._schema.evidence_id_index
+
+            new_results = {}
+            if evidence_id_col != -1:
+                for row in rows:
+                    if len(row) > evidence_id_col:
+                        new_results[str(row[evidence_id_col])] = row_to_result(headers, row)
+
+            # Rows come back from the cursor onwards (blank rows included as []),
+            # so the next unread row is right after them
+            self._next_row += len(rows)
+
+            return new_results
+
+    def reset(self):
+        """Forget the cursor and header so the next read starts from row 1"""
+        self._schema = None
+        self._next_row = 1
+
+    def poll_once(self):
+        """One tick: a single read of the output sheet fans out to every waiter"""
+        with self._lock:
+            if not self._waiters:
+                return
+
+        results = self.read_results()
+        self.resolve(results)
+
+    def resolve(self, results):
+        """Hand results to any waiters for those evidence ids (polled or pushed)"""
+        ready = []
+        with self._lock:
+            for evidence_id in list(self._waiters):
+                if evidence_id in results:
+                    ready.append((results[evidence_id], self._waiters.pop(evidence_id)))
+
+        for result, callbacks in ready:
+            for callback in callbacks:
+                callback(result)
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+def get_output_poller(group):
+    """The process-wide poller for a group's output sheet"""
+    with _pollers_lock:
+        poller = _pollers.get(group)
+        if poller is None:
+            poller = _pollers[group] = OutputSheetPoller(group)
+        return poller
@@ -0,0 +1,128 @@
+"""
+Writes to '<group> processing sheet'
+Marking rows are collected for a short window and appended per group in a
+single multi-row request
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+from .sheets import SPREADSHEET_ID, sheet_range
+from .sheets_backends import get_sheets_backend
+
+
+def processing_sheet_name(group):
+    return f"{group} processing sheet"
+
+
+def append_processing_rows(backend, group, rows):
+    """Append rows to the group's processing sheet"""
+    return backend.append(
+        SPREADSHEET_ID,
+        sheet_range(processing_sheet_name(group), 'A:I'),
+        rows
+    )
+
+
+class AppendBatcher:
+    """
+    Coalesces processing-sheet appends.
+    A group's batch is flushed once its oldest row has waited `window`
+    seconds or it holds `max_rows` rows, whichever comes first. Every caller
+    gets a Future that settles when its batch has been written.
+    """
+
+    def __init__(self, window=None, max_rows=None):
+        self._window = window
+        self._max_rows = max_rows
+        self._cond = threading.Condition()
+        self._pending = {}  # group -> (deadline, [(row, future), ...])
+        self._thread = None
+
+    @property
+    def window(self):
+        if self._window is not None:
+            return self._window
+        return getattr(settings, 'MARKING_APPEND_WINDOW', 0.2)
+
+    @property
+    def max_rows(self):
+        if self._max_rows is not None:
+            return self._max_rows
+        return getattr(settings, 'MARKING_APPEND_MAX_ROWS', 50)
+
+    def submit(self, group, row):
+        """Queue one row for the group's processing sheet"""
+        return self.submit_many(group, [row])[0]
+
+    def submit_many(self, group, rows):
+        """Queue several rows for the same batch, returns one Future per row"""
+        futures = [Future() for _ in rows]
+
+        with self._cond:
+            if group not in self._pending:
+                self._pending[group] = (time.monotonic() + self.window, [])
+            self._pending[group][1].extend(zip(rows, futures))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='processing-appends', daemon=True)
+                self._thread.start()
+
+            self._cond.notify()
+
+        return futures
+
+    def _take_due_batches(self):
+        """Pop batches that are ready to flush; returns (batches, seconds until the next one is due)"""
+        now = time.monotonic()
+        due = []
+        next_deadline = None
+
+        for group, (deadline, items) in list(self._pending.items()):
+            if deadline <= now or len(items) >= self.max_rows:
+                due.append((group, items))
+                del self._pending[group]
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+
+        wait = None if next_deadline is None else max(0, next_deadline - now)
+        return due, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due, wait = self._take_due_batches()
+                while not due:
+                    self._cond.wait(wait)
+                    due, wait = self._take_due_batches()
+
+            for group, items in due:
+                self._flush(group, items)
+
+    def _flush(self, group, items):
+        # Large bursts still go out in max_rows-sized appends
+        for start in range(0, len(items), self.max_rows):
+            chunk = items[start:start + self.max_rows]
+            try:
+                result = append_processing_rows(get_sheets_backend(), group, [row for row, _ in chunk])
+            except Exception as e:
+                for _, future in chunk:
+                    future.set_exception(e)
+            else:
+                for _, future in chunk:
+                    future.set_result(result)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_append_batcher():
+    """The process-wide processing-sheet append batcher"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = AppendBatcher()
+        return _batcher
@@ -0,0 +1,71 @@
+"""
+Column-narrowed sheet reads
+Works out the smallest column range each sheet needs from its cached
+schema (see sheet_schemas.py), so lookups stop pulling A:Z from the larger
+group sheets. A sheet without a cached schema is read in full once and its
+first row becomes the cached header - no extra requests.
+"""
+from .sheet_schemas import schema_cache
+from .sheets import column_letter, get_sheets_data_batch, sheet_range
+
+
+# Full width of a read, as used before narrowing
+FULL_COLUMNS = 'A:Z'
+FULL_WIDTH = 26
+
+# Student search looks for the email in the first 6 columns (A:F)
+LOOKUP_WIDTH = 6
+
+
+def planned_width(schema):
+    """
+    Columns a lookup needs from a sheet: the search columns plus the
+    component / evidence columns of target sheets
+    """
+    last = max(LOOKUP_WIDTH - 1, schema.component_index, schema.evidence_index)
+    return min(last + 1, FULL_WIDTH)
+
+
+def plan_reads(sheet_titles):
+    """{sheet_title: width} - narrowed where the schema is cached, None (A:Z) otherwise"""
+    plan = {}
+    for title in sheet_titles:
+        schema = schema_cache.get(title)
+        plan[title] = None if schema is None else planned_width(schema)
+    return plan
+
+
+def _columns(width):
+    return FULL_COLUMNS if width is None else f"A:{column_letter(width - 1)}"
+
+
+def _read(backend, spreadsheet_id, plan):
+    titles = list(plan)
+    ranges = [sheet_range(title, _columns(plan[title])) for title in titles]
+    return dict(zip(titles, get_sheets_data_batch(backend, spreadsheet_id, ranges)))
+
+
+def fetch_planned(backend, spreadsheet_id, sheet_titles):
+    """
+    Column-narrowed replacement for fetch_sheets(): one batch request,
+    returns {sheet_title: rows}
+    """
+    plan = plan_reads(sheet_titles)
+    sheet_rows = _read(backend, spreadsheet_id, plan)
+
+    changed = {}
+    for title, rows in sheet_rows.items():
+        if plan[title] is None:
+            # Full reads refresh the schema the next plans are made from
+            schema_cache.set(title, rows[0] if rows else [])
+        elif not schema_cache.matches(title, rows[0] if rows else [], plan[title]):
+            # Header changed under the cached schema - the narrowed columns
+            # may be the wrong ones, read the sheet in full again
+            changed[title] = None
+
+    if changed:
+        for title, rows in _read(backend, spreadsheet_id, changed).items():
+            schema_cache.set(title, rows[0] if rows else [])
+            sheet_rows[title] = rows
+
+    return sheet_rows
@@ -0,0 +1,108 @@
+"""
+Sheet schema cache
+Column layout per sheet title, detected once from the header row and
+shared by the lookups, the read planner and the output pollers. An entry
+is replaced as soon as a read shows a different header.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from .sheets import detect_component_columns, find_evidence_id_column
+
+
+# Column positions of one sheet (0-based, evidence_id_index is -1 when absent)
+SheetSchema = namedtuple('SheetSchema', [
+    'title', 'header', 'component_index', 'evidence_index', 'start_row', 'evidence_id_index',
+])
+
+
+def trim_row(row):
+    """Row without trailing empty cells, the way the API returns it"""
+    row = list(row)
+    while row and row[-1] in ('', None):
+        row.pop()
+    return row
+
+
+def build_schema(title, header):
+    header = trim_row(header)
+    component_index, evidence_index, start_row = detect_component_columns(header)
+    return SheetSchema(
+        title=title,
+        header=header,
+        component_index=component_index,
+        evidence_index=evidence_index,
+        start_row=start_row,
+        evidence_id_index=find_evidence_id_column(header),
+    )
+
+
+class SheetSchemaCache:
+    """
+    SheetSchema per sheet title.
+    get() treats entries older than `ttl` seconds as missing so the sheet is
+    read in full again; current() returns whatever is cached.
+    """
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._schemas = {}  # sheet title -> (cached_at, SheetSchema)
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'SHEETS_HEADER_TTL', 600)
+
+    def get(self, title):
+        with self._lock:
+            cached = self._schemas.get(title)
+        if cached is None or time.monotonic() - cached[0] > self.ttl:
+            return None
+        return cached[1]
+
+    def current(self, title):
+        with self._lock:
+            cached = self._schemas.get(title)
+        return None if cached is None else cached[1]
+
+    def set(self, title, header):
+        """Cache the layout detected from a full header row"""
+        schema = build_schema(title, header)
+        with self._lock:
+            self._schemas[title] = (time.monotonic(), schema)
+        return schema
+
+    def matches(self, title, first_row, width):
+        """
+        Check the first row of a read `width` columns wide against the cached
+        header. A different header drops the entry and returns False.
+        """
+        schema = self.current(title)
+        if schema is not None and trim_row(first_row) == trim_row(schema.header[:width]):
+            return True
+
+        self.invalidate(title)
+        return False
+
+    def invalidate(self, title=None):
+        with self._lock:
+            if title is None:
+                self._schemas.clear()
+            else:
+                self._schemas.pop(title, None)
+
+
+schema_cache = SheetSchemaCache()
+
+
+def schema_for(title, rows):
+    """Cached schema for a sheet, detected from the rows just read when it isn't cached"""
+    schema = schema_cache.get(title)
+    if schema is None:
+        schema = schema_cache.set(title, rows[0] if rows else [])
+    return schema
@@ -0,0 +1,252 @@
+"""
+Google Sheets access
+Shared Google client and read helpers used by the evidence views
+The helpers take a Sheets backend (see sheets_backends.py)
+"""
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from google.oauth2 import service_account
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+
+
+# Spreadsheet ID from the URL
+SPREADSHEET_ID = "1K5gdYpM3ULvMZ-5SisQZjXSSdtoT1p3Fl6gS-rxMuCg"
+
+# Group to sheet name mapping (from PHP code)
+# Extended to support more groups
+GROUP_SHEET_MAPPING = {
+    "A": "Level 3 CM",
+    "B": "Level 5 LO",
+    "C": "Level 5 HRM",
+    "D": "Level 5 Business Management",
+    "E": "Top-up",
+    "PCP": "PCP",  # PCP maps to PCP sheet
+    "ME": "ME",    # ME maps to ME sheet  
+    "PDF": "PDF",  # PDF maps to PDF sheet
+}
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+# Process-wide client state
+_credentials = None
+_credentials_lock = threading.Lock()
+_discovery_document = None
+_thread_local = threading.local()
+
+
+def get_service_account_path():
+    """Get path to service account JSON file"""
+    # Try backend directory first
+    backend_dir = Path(settings.BASE_DIR)
+    sa_path = backend_dir / "ai-marking-tool-480910-1f3c7a43f500.json"
+    
+    if sa_path.exists():
+        return str(sa_path)
+    
+    return None
+
+
+def get_credentials():
+    """
+    Service account credentials, loaded once per process
+    google-auth refreshes the access token automatically before it expires
+    """
+    global _credentials
+    
+    if _credentials is None:
+        with _credentials_lock:
+            if _credentials is None:
+                sa_path = get_service_account_path()
+                
+                if not sa_path:
+                    raise ValueError("Service account file not found")
+                
+                _credentials = service_account.Credentials.from_service_account_file(
+                    sa_path,
+                    scopes=SCOPES
+                )
+    
+    return _credentials
+
+
+def get_discovery_document():
+    """Sheets v4 discovery document from the copy bundled with googleapiclient"""
+    global _discovery_document
+    
+    if _discovery_document is None:
+        document = get_static_doc('sheets', 'v4')
+        if document is None:
+            raise ValueError("Bundled Sheets discovery document not found")
+        _discovery_document = document
+    
+    return _discovery_document
+
+
+def get_sheets_service():
+    """
+    Authenticated Google Sheets service, reused across requests
+    httplib2 transports are not thread-safe, so each thread gets its own
+    service (and authorized Http) built from the shared credentials
+    """
+    service = getattr(_thread_local, 'service', None)
+    
+    if service is None:
+        service = build_from_document(
+            get_discovery_document(),
+            credentials=get_credentials()
+        )
+        _thread_local.service = service
+    
+    return service
+
+
+def sheet_range(sheet_title, columns='A:Z'):
+    """A1 range for a sheet, quoted so titles with spaces work"""
+    escaped = sheet_title.replace("'", "''")
+    return f"'{escaped}'!{columns}"
+
+
+def column_letter(index):
+    """A1 column letters for a 0-based column index (0 -> A, 26 -> AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def get_sheets_list(backend, spreadsheet_id):
+    """Get list of all sheets in the spreadsheet"""
+    try:
+        return backend.list_sheets(spreadsheet_id)
+    except HttpError as e:
+        raise ValueError(f"Failed to get sheets list: {e}")
+
+
+def get_sheet_data(backend, spreadsheet_id, range_name):
+    """Fetch data from a specific sheet range"""
+    try:
+        return backend.get(spreadsheet_id, range_name)
+    except HttpError as e:
+        raise ValueError(f"Failed to get sheet data: {e}")
+
+
+def get_sheets_data_batch(backend, spreadsheet_id, range_names):
+    """
+    Fetch several ranges in a single batch request
+    Returns a list of row lists in the same order as range_names
+    """
+    if not range_names:
+        return []
+    
+    try:
+        return backend.batch_get(spreadsheet_id, list(range_names))
+    except HttpError as e:
+        raise ValueError(f"Failed to get sheet data: {e}")
+
+
+def fetch_sheets(backend, spreadsheet_id, sheet_titles, columns='A:Z'):
+    """Fetch the given sheets in one batch request, returns {sheet_title: rows}"""
+    sheet_titles = list(sheet_titles)
+    ranges = [sheet_range(title, columns) for title in sheet_titles]
+    return dict(zip(sheet_titles, get_sheets_data_batch(backend, spreadsheet_id, ranges)))
+
+
+def candidate_sheets(sheets):
+    """Sheets that can hold students - skip only output sheets (target sheets are searched)"""
+    return [s['title'] for s in sheets if 'output' not in s['title'].lower()]
+
+
+HEADER_CELLS = ['email', 'student email', 'id', 'student id', 'name']
+
+
+def is_header_row(i, row):
+    """Skip header row if it looks like a header"""
+    return i == 0 and any(isinstance(cell, str) and
+                          cell.lower() in HEADER_CELLS
+                          for cell in row[:6])
+
+
+def iter_student_rows(rows):
+    """Yield (row_index, row) for rows that can hold a student"""
+    for i, row in enumerate(rows):
+        if len(row) < 2:
+            continue
+        if is_header_row(i, row):
+            continue
+        yield i, row
+
+
+def row_keys(row):
+    """
+    Lookup keys for a row
+    Email can be in any of the first 6 columns, ID in the first 2
+    """
+    email_keys = [str(cell) for cell in row[:6] if '@' in str(cell)]
+    id_keys = [str(cell) for cell in row[:2] if str(cell).strip()]
+    return email_keys, id_keys
+
+
+def target_sheet_for_group(group):
+    """Target sheet based on group mapping"""
+    # If no mapping exists, try using the group name directly as sheet name
+    return GROUP_SHEET_MAPPING.get(group) or group
+
+
+def detect_component_columns(header_row):
+    """
+    Detect component / evidence column indexes in a target sheet header
+    Returns (component_index, evidence_index, start_row)
+    """
+    component_index = None
+    evidence_index = None
+    
+    for idx, cell in enumerate(header_row):
+        if isinstance(cell, str) and 'component' in cell.lower():
+            component_index = idx
+        if isinstance(cell, str) and 'evidence' in cell.lower():
+            evidence_index = idx
+    
+    if component_index is None:
+        component_index = 3  # Default fallback
+    
+    if evidence_index is None:
+        evidence_index = 4  # Default fallback
+    
+    # Determine starting row (skip header if it contains 'component')
+    start_row = 0
+    if component_index < len(header_row):
+        if isinstance(header_row[component_index], str) and 'component' in header_row[component_index].lower():
+            start_row = 1
+    
+    return component_index, evidence_index, start_row
+
+
+def parse_component_cell(value):
+    """Parse component JSON if it's a JSON string, otherwise keep the value as is"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            # Not JSON, keep as string
+            return value
+    return value
+
+
+# Header names the output sheet uses for the evidence id column
+EVIDENCE_ID_HEADERS = ['evidenceid', 'evidence_id', 'evidence id']
+
+
+def find_evidence_id_column(headers):
+    """Find evidence_id column (usually column E - EvidenceId)"""
+    for idx, header in enumerate(headers):
+        if isinstance(header, str) and header.lower() in EVIDENCE_ID_HEADERS:
+            return idx
+    return -1
@@ -0,0 +1,295 @@
+"""
+Sheets backends
+Everything the evidence code needs from a spreadsheet: list sheets, get,
+batch get and append. SHEETS_BACKEND picks the implementation:
+
+    "google"  - the live spreadsheet through googleapiclient (default)
+    "local"   - an in-process fake, optionally seeded from a JSON file, that
+                simulates the marking engine by writing output rows after a delay
+"""
+import json
+import re
+import threading
+
+import httplib2
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from googleapiclient.errors import HttpError
+
+from .sheets import get_sheets_service
+from .sheets_quota import call_sheets
+
+
+class SheetsBackend:
+    """
+    Interface shared by every backend. Failures raise googleapiclient's
+    HttpError, or SheetsUnavailable when Google is rate limiting or down.
+    value_render_option is the API's valueRenderOption (FORMATTED_VALUE,
+    UNFORMATTED_VALUE or FORMULA); backends without rendering ignore it.
+    """
+
+    def list_sheets(self, spreadsheet_id):
+        """[{'title': ..., 'sheetId': ..., 'index': ...}, ...]"""
+        raise NotImplementedError
+
+    def get(self, spreadsheet_id, range_name, value_render_option=None):
+        """Rows of one A1 range"""
+        raise NotImplementedError
+
+    def batch_get(self, spreadsheet_id, range_names, value_render_option=None):
+        """Rows of several A1 ranges, in the same order"""
+        raise NotImplementedError
+
+    def append(self, spreadsheet_id, range_name, rows):
+        """Append rows after the last row of the range's sheet"""
+        raise NotImplementedError
+
+
+def value_render_setting():
+    """
+    How cell values are rendered. The evidence code compares and returns
+    cells as strings, so FORMATTED_VALUE is the default
+    """
+    return getattr(settings, 'SHEETS_VALUE_RENDER_OPTION', 'FORMATTED_VALUE')
+
+
+class GoogleSheetsBackend(SheetsBackend):
+    """
+    The live spreadsheet, through each thread's own Sheets service
+    Every request goes through call_sheets() for budgeting, retries and
+    circuit breaking (appends are retried on 429 only); reads ask only for
+    the values (fields mask)
+    """
+
+    def list_sheets(self, spreadsheet_id):
+        spreadsheet = call_sheets(lambda: get_sheets_service().spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties'
+        ).execute())
+
+        sheets = []
+        for sheet in spreadsheet.get('sheets', []):
+            props = sheet.get('properties', {})
+            sheets.append({
+                'title': props.get('title'),
+                'sheetId': props.get('sheetId'),
+                'index': props.get('index')
+            })
+        return sheets
+
+    def get(self, spreadsheet_id, range_name, value_render_option=None):
+        result = call_sheets(lambda: get_sheets_service().spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_name,
+            valueRenderOption=value_render_option or value_render_setting(),
+            fields='values'
+        ).execute())
+        return result.get('values', [])
+
+    def batch_get(self, spreadsheet_id, range_names, value_render_option=None):
+        result = call_sheets(lambda: get_sheets_service().spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=list(range_names),
+            valueRenderOption=value_render_option or value_render_setting(),
+            fields='valueRanges(values)'
+        ).execute())
+        return [vr.get('values', []) for vr in result.get('valueRanges', [])]
+
+    def append(self, spreadsheet_id, range_name, rows):
+        # Not idempotent: a retry after a 5xx or a timeout could add the rows twice
+        return call_sheets(lambda: get_sheets_service().spreadsheets().values().append(
+            spreadsheetId=spreadsheet_id,
+            range=range_name,
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ).execute(), idempotent=False)
+
+
+_CELL_RE = re.compile(r'^([A-Z]*)(\d*)$')
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index - 1
+
+
+def parse_a1(range_name):
+    """
+    Split an A1 range into (sheet_title, first_row, last_row, first_col, last_col)
+    Rows are 0-based, columns 0-based, open ends are None
+    """
+    if '!' in range_name:
+        title, cells = range_name.rsplit('!', 1)
+    else:
+        title, cells = range_name, ''
+
+    if len(title) >= 2 and title[0] == "'" and title[-1] == "'":
+        title = title[1:-1].replace("''", "'")
+
+    start, _, end = cells.upper().partition(':')
+    start_match = _CELL_RE.match(start)
+    end_match = _CELL_RE.match(end or start)
+    if not start_match or not end_match:
+        raise ValueError(f"Unsupported range: {range_name}")
+
+    start_col, start_row = start_match.groups()
+    end_col, end_row = end_match.groups()
+
+    return (
+        title,
+        int(start_row) - 1 if start_row else 0,
+        int(end_row) - 1 if end_row else None,
+        _column_index(start_col) if start_col else 0,
+        _column_index(end_col) if end_col else None,
+    )
+
+
+def _http_error(status_code, message):
+    """An HttpError shaped like the ones googleapiclient raises"""
+    content = json.dumps({'error': {'code': status_code, 'message': message}}).encode()
+    return HttpError(httplib2.Response({'status': status_code}), content)
+
+
+# Output sheet layout written by the simulated marking engine
+LOCAL_OUTPUT_HEADERS = [
+    'UserId', 'UserName', 'ComponentId', 'ComponentName', 'EvidenceId',
+    'EvidenceName', 'Grade', 'Feedback',
+]
+
+
+def simulated_marking(row):
+    """Default marking for the local backend: pass everything"""
+    return row[:6] + ['Pass', 'Simulated marking result']
+
+
+class LocalSheetsBackend(SheetsBackend):
+    """
+    In-memory spreadsheet for benchmarks and tests.
+    Seed it from a JSON file shaped {"<sheet title>": [[...row...], ...]} or
+    with set_sheet(). Rows appended to '<group> processing sheet' are marked
+    into '<group> Output' after `marking_delay` seconds (None disables it).
+    """
+
+    def __init__(self, path=None, marking_delay=None, marker=simulated_marking):
+        self._lock = threading.RLock()
+        self._sheets = {}
+        self.marking_delay = marking_delay
+        self.marker = marker
+
+        if path:
+            with open(path, encoding='utf-8') as f:
+                for title, rows in json.load(f).items():
+                    self.set_sheet(title, rows)
+
+    def set_sheet(self, title, rows):
+        with self._lock:
+            self._sheets[title] = [list(row) for row in rows]
+
+    def sheet(self, title):
+        with self._lock:
+            return [list(row) for row in self._sheets.get(title, [])]
+
+    def list_sheets(self, spreadsheet_id):
+        with self._lock:
+            return [
+                {'title': title, 'sheetId': index, 'index': index}
+                for index, title in enumerate(self._sheets)
+            ]
+
+    def get(self, spreadsheet_id, range_name, value_render_option=None):
+        title, first_row, last_row, first_col, last_col = parse_a1(range_name)
+
+        with self._lock:
+            if title not in self._sheets:
+                raise _http_error(400, f"Unable to parse range: {range_name}")
+            rows = self._sheets[title]
+            stop = None if last_row is None else last_row + 1
+            col_stop = None if last_col is None else last_col + 1
+            values = [list(row[first_col:col_stop]) for row in rows[first_row:stop]]
+
+        # Like the API: trailing empty cells and rows are left out
+        for row in values:
+            while row and row[-1] in ('', None):
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def batch_get(self, spreadsheet_id, range_names, value_render_option=None):
+        return [self.get(spreadsheet_id, range_name) for range_name in range_names]
+
+    def append(self, spreadsheet_id, range_name, rows):
+        title = parse_a1(range_name)[0]
+        rows = [list(row) for row in rows]
+
+        with self._lock:
+            if title not in self._sheets:
+                raise _http_error(400, f"Unable to parse range: {range_name}")
+            sheet = self._sheets[title]
+            start = len(sheet) + 1
+            sheet.extend(rows)
+
+        suffix = ' processing sheet'
+        if self.marking_delay is not None and title.endswith(suffix):
+            group = title[:-len(suffix)]
+            timer = threading.Timer(self.marking_delay, self._write_output, args=(group, rows))
+            timer.daemon = True
+            timer.start()
+
+        return {
+            'updates': {
+                'updatedRange': f"'{title}'!{start}:{start + len(rows) - 1}",
+                'updatedRows': len(rows),
+            }
+        }
+
+    def _write_output(self, group, rows):
+        title = f"{group} Output"
+        with self._lock:
+            sheet = self._sheets.setdefault(title, [])
+            if not sheet:
+                sheet.append(list(LOCAL_OUTPUT_HEADERS))
+            sheet.extend(self.marker(row) for row in rows)
+
+
+BACKENDS = {
+    'google': GoogleSheetsBackend,
+    'local': LocalSheetsBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_sheets_backend():
+    """Build the backend named by SHEETS_BACKEND (a short name or a dotted path)"""
+    name = getattr(settings, 'SHEETS_BACKEND', 'google')
+
+    if name == 'local':
+        return LocalSheetsBackend(
+            path=getattr(settings, 'SHEETS_LOCAL_PATH', None) or None,
+            marking_delay=getattr(settings, 'SHEETS_LOCAL_MARKING_DELAY', 5),
+        )
+
+    backend_class = BACKENDS.get(name) or import_string(name)
+    return backend_class()
+
+
+def get_sheets_backend():
+    """The process-wide Sheets backend"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_sheets_backend()
+        return _backend
+
+
+def set_sheets_backend(backend):
+    """Swap the process-wide backend (benchmarks and tests)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,209 @@
+"""
+Quota-aware wrapper around Google Sheets calls
+Every request to Google goes through call_sheets(), which
+  - fails fast while the circuit breaker is open,
+  - waits for room in a per-minute request budget,
+  - retries 429 / 5xx responses with exponential backoff and full jitter
+    (writes that aren't idempotent only on 429)
+"""
+import random
+import socket
+import threading
+import time
+from collections import deque
+
+import httplib2
+from django.conf import settings
+
+from googleapiclient.errors import HttpError
+
+
+# Responses worth retrying: quota exhaustion and Google-side failures
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SheetsUnavailable(Exception):
+    """Google Sheets is rate limiting us or unhealthy; the call was not completed"""
+
+
+def error_status(error):
+    """HTTP status of an HttpError, or None"""
+    try:
+        return int(error.resp.status)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_retryable(error, idempotent=True):
+    """
+    A 5xx or a dropped connection may come after Google applied the request,
+    so only idempotent calls retry those; a 429 was never applied
+    """
+    if isinstance(error, HttpError):
+        status = error_status(error)
+        return status == 429 or (idempotent and status in RETRYABLE_STATUSES)
+    # Dropped connections and timeouts from the transport
+    return idempotent and isinstance(error, (socket.timeout, ConnectionError, httplib2.HttpLib2Error))
+
+
+class RequestBudget:
+    """
+    Sliding one-minute window of request slots.
+    Callers queue in acquire() until a slot frees up.
+    """
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._cond = threading.Condition()
+        self._sent = deque()  # monotonic timestamps of requests in the last minute
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= 60:
+                    self._sent.popleft()
+
+                if len(self._sent) < self.per_minute:
+                    self._sent.append(now)
+                    return
+
+                wait = min(60 - (now - self._sent[0]), deadline - now)
+                if wait <= 0:
+                    raise SheetsUnavailable("Sheets request budget exhausted, try again shortly")
+                self._cond.wait(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls and rejects calls for
+    `reset_timeout` seconds; then lets a single trial call through (half-open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self._state()
+            if state == 'open' or (state == 'half-open' and self._trial_running):
+                raise SheetsUnavailable("Google Sheets is unavailable, try again shortly")
+            if state == 'half-open':
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def cancel_trial(self):
+        """The trial call never reached Google; let the next caller try"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+_budget = None
+_breaker = None
+_init_lock = threading.Lock()
+
+
+def get_request_budget():
+    global _budget
+    with _init_lock:
+        if _budget is None:
+            _budget = RequestBudget(getattr(settings, 'SHEETS_REQUESTS_PER_MINUTE', 240))
+        return _budget
+
+
+def get_circuit_breaker():
+    global _breaker
+    with _init_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                getattr(settings, 'SHEETS_BREAKER_THRESHOLD', 5),
+                getattr(settings, 'SHEETS_BREAKER_RESET', 30),
+            )
+        return _breaker
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    base = getattr(settings, 'SHEETS_BACKOFF_BASE', 0.5)
+    cap = getattr(settings, 'SHEETS_BACKOFF_MAX', 16)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_sheets(request, idempotent=True):
+    """
+    Run a zero-argument callable that makes one Sheets request, with
+    budgeting, circuit breaking and retries.
+    Pass idempotent=False for writes that must not run twice (appends):
+    they are retried on 429 only.
+    Raises SheetsUnavailable when the budget or breaker refuses the call or
+    retries run out; other errors of a non-retried call are raised as is.
+    """
+    budget = get_request_budget()
+    breaker = get_circuit_breaker()
+    max_retries = getattr(settings, 'SHEETS_MAX_RETRIES', 4)
+    budget_timeout = getattr(settings, 'SHEETS_BUDGET_TIMEOUT', 30)
+
+    attempt = 0
+    while True:
+        # The breaker goes first, so calls it rejects don't use up the budget
+        breaker.before_call()
+        try:
+            budget.acquire(budget_timeout)
+        except SheetsUnavailable:
+            breaker.cancel_trial()
+            raise
+
+        try:
+            result = request()
+        except Exception as e:
+            if not is_retryable(e):
+                if isinstance(e, HttpError):
+                    # Google answered (400, 403, 404...) - not a health problem
+                    breaker.record_success()
+                else:
+                    breaker.cancel_trial()
+                raise
+
+            breaker.record_failure()
+            if not is_retryable(e, idempotent):
+                raise SheetsUnavailable(f"Google Sheets write failed and may or may not have been applied: {e}") from e
+            if attempt >= max_retries:
+                raise SheetsUnavailable(f"Google Sheets request failed after {attempt + 1} attempts: {e}") from e
+
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        breaker.record_success()
+        return result
@@ -0,0 +1,130 @@
+"""
+Process-level student directory
+Maps normalized email / student ID to the sheet row holding the student,
+so evidence lookups don't have to scan every sheet on each request
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+
+# Where a student lives in the spreadsheet
+StudentEntry = namedtuple('StudentEntry', ['sheet_title', 'row_index', 'group', 'row'])
+
+
+def normalize_email(value):
+    return str(value).lower().strip() if value else ''
+
+
+def normalize_id(value):
+    return str(value).strip() if value else ''
+
+
+class StudentDirectory:
+    """
+    In-memory index of students, rebuilt in a background thread once older than the TTL.
+
+    `loader` is a callable returning (sheets, entries) where sheets is the
+    spreadsheet's sheet list and entries is an iterable of
+    (email_keys, id_keys, StudentEntry) tuples in sheet/row order.
+    """
+
+    def __init__(self, loader, ttl=None):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._by_email = {}
+        self._by_id = {}
+        self._sheets = []
+        self._built_at = None
+        self._rebuilding = False
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'STUDENT_DIRECTORY_TTL', 300)
+
+    def is_warm(self):
+        return self._built_at is not None
+
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl
+
+    def sheets(self):
+        return list(self._sheets)
+
+    def lookup(self, student_email=None, student_id=None):
+        """
+        Return the StudentEntry for the student, or None on a miss.
+        Never calls Sheets itself; a cold or stale index schedules a background rebuild.
+        """
+        if self.is_stale():
+            self.refresh_async()
+
+        entry = None
+        email_key = normalize_email(student_email)
+        id_key = normalize_id(student_id)
+
+        if email_key:
+            entry = self._by_email.get(email_key)
+        if entry is None and id_key:
+            entry = self._by_id.get(id_key)
+
+        return entry
+
+    def remember(self, entry, student_email=None, student_id=None):
+        """Record a student found by a live scan so the next lookup is a hit"""
+        with self._lock:
+            if normalize_email(student_email):
+                self._by_email[normalize_email(student_email)] = entry
+            if normalize_id(student_id):
+                self._by_id[normalize_id(student_id)] = entry
+
+    def refresh_async(self):
+        """Start a background rebuild unless one is already running"""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        thread = threading.Thread(target=self._rebuild_in_background, name='student-directory', daemon=True)
+        thread.start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # Keep serving the previous index; the next stale lookup retries
+            pass
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def rebuild(self):
+        """Reload every sheet through the loader and swap the index in atomically"""
+        sheets, entries = self._loader()
+
+        by_email = {}
+        by_id = {}
+        for email_keys, id_keys, entry in entries:
+            # First occurrence wins, matching the order of a live scan
+            for key in email_keys:
+                by_email.setdefault(normalize_email(key), entry)
+            for key in id_keys:
+                by_id.setdefault(normalize_id(key), entry)
+
+        with self._lock:
+            self._sheets = list(sheets)
+            self._by_email = by_email
+            self._by_id = by_id
+            self._built_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._by_email = {}
+            self._by_id = {}
+            self._sheets = []
+            self._built_at = None
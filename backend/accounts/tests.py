@@ -1,3 +1,334 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .evidence_mirror import sync_mirror
+from .evidence_views import _stream_url
+from .marking import in_flight_job, serialize_job, submit_marking_job
+from .models import MarkingJob, MarkingResult, SheetSyncState
+from .output_pollers import OutputSheetPoller
+from .sheet_schemas import schema_cache
+from .sheets_backends import LOCAL_OUTPUT_HEADERS, LocalSheetsBackend, _http_error, set_sheets_backend
+from .sheets_quota import CircuitBreaker, RequestBudget, SheetsUnavailable, call_sheets
+
+
+class LocalSheetsMixin:
+    """Every test gets its own in-memory spreadsheet"""
+
+    def setUp(self):
+        super().setUp()
+        self.backend = LocalSheetsBackend()
+        set_sheets_backend(self.backend)
+        schema_cache.invalidate()
+
+    def tearDown(self):
+        set_sheets_backend(None)
+        schema_cache.invalidate()
+        super().tearDown()
+
+
+@override_settings(SHEETS_BACKOFF_BASE=0, SHEETS_MAX_RETRIES=3)
+class CallSheetsTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=5, reset_timeout=30)
+        self.budget = RequestBudget(per_minute=10)
+        patches = [
+            mock.patch('accounts.sheets_quota.get_circuit_breaker', return_value=self.breaker),
+            mock.patch('accounts.sheets_quota.get_request_budget', return_value=self.budget),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def flaky(self, *statuses):
+        """A request that fails with each status in turn, then succeeds"""
+        calls = []
+
+        def request():
+            calls.append(1)
+            if len(calls) <= len(statuses):
+                raise _http_error(statuses[len(calls) - 1], 'flaky')
+            return 'ok'
+        return request, calls
+
+    def test_rate_limited_append_is_retried(self):
+        request, calls = self.flaky(429)
+        self.assertEqual(call_sheets(request, idempotent=False), 'ok')
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_append_is_not_retried(self):
+        request, calls = self.flaky(503)
+        with self.assertRaises(SheetsUnavailable):
+            call_sheets(request, idempotent=False)
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_read_is_retried(self):
+        request, calls = self.flaky(503, 500)
+        self.assertEqual(call_sheets(request), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_open_breaker_uses_no_budget(self):
+        for _ in range(self.breaker.threshold):
+            self.breaker.record_failure()
+
+        for _ in range(self.budget.per_minute):
+            with self.assertRaises(SheetsUnavailable):
+                call_sheets(lambda: 'ok')
+        # every slot is still free
+        for _ in range(self.budget.per_minute):
+            self.budget.acquire(timeout=0)
+
+
+class OutputSheetPollerTests(LocalSheetsMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend.set_sheet('PCP Output', [
+            LOCAL_OUTPUT_HEADERS,
+            ['11', 'A', '7', 'Comp', '555', 'E', 'Fail', 'old result'],
+        ])
+        # Never ticks on its own; the test reads by hand
+        self.poller = OutputSheetPoller('PCP', interval=3600)
+
+    def test_rows_from_before_subscribing_are_not_handed_out(self):
+        callback = mock.Mock()
+        self.poller.subscribe('555', callback)
+        self.addCleanup(self.poller.unsubscribe, '555', callback)
+
+        self.assertEqual(self.poller.read_results(), {})
+
+        rows = self.backend.sheet('PCP Output')
+        self.backend.set_sheet('PCP Output', rows + [['11', 'A', '7', 'Comp', '555', 'E', 'Pass', 'new result']])
+        self.poller.poll_once()
+        callback.assert_called_once()
+        self.assertEqual(callback.call_args[0][0]['Feedback'], 'new result')
+
+
+class MarkingJobEventsTests(TestCase):
+    jobs_path = '/api/accounts/mark-evidence/'
+
+    def setUp(self):
+        user = User.objects.create_user(username='marker', password='x')
+        self.job = MarkingJob.objects.create(
+            user=user, student_id='11', group='PCP', evidence_id='1', row=[], status='completed', result={}
+        )
+
+    async def test_stream_opens_with_the_job_token(self):
+        response = await self.async_client.get(_stream_url(self.jobs_path, self.job))
+
+        self.assertEqual(response.status_code, 200)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b'event: result', body)
+
+    async def test_token_of_another_job_is_refused(self):
+        other = await MarkingJob.objects.acreate(
+            user_id=self.job.user_id, student_id='11', group='PCP', evidence_id='2', row=[], status='completed'
+        )
+        token = _stream_url(self.jobs_path, other).split('?token=')[1]
+
+        response = await self.async_client.get(f'{self.jobs_path}{self.job.pk}/events/?token={token}')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(MARKING_EVENTS_TOKEN_MAX_AGE=-1)
+    async def test_expired_token_is_refused(self):
+        response = await self.async_client.get(_stream_url(self.jobs_path, self.job))
+        self.assertEqual(response.status_code, 401)
+
+
+class BulkMarkEvidenceTests(TestCase):
+    url = '/api/accounts/mark-evidence/bulk/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='marker', password='x'))
+        MarkingResult.objects.create(student_id='11', group='PCP', evidence_id='555', result={'Grade': 'Pass'})
+
+    def test_marked_evidence_is_served_from_storage(self):
+        response = self.client.post(self.url, {
+            'student_id': '11', 'group': 'PCP', 'items': [{'evidence_id': 555, 'component_id': 7}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['evidence_id'] for item in response.data['cached']], ['555'])
+        self.assertFalse(MarkingJob.objects.exists())
+
+    def test_remark_submits_again(self):
+        response = self.client.post(self.url, {
+            'student_id': '11', 'group': 'PCP', 'remark': True,
+            'items': [{'evidence_id': 555, 'component_id': 7}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['cached'], [])
+        self.assertEqual(MarkingJob.objects.filter(evidence_id='555').count(), 1)
+
+
+class InFlightJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='marker', password='x')
+        self.long_ago = timezone.now() - timedelta(hours=1)
+
+    def job(self, evidence_id, status, **fields):
+        return MarkingJob.objects.create(
+            user=self.user, student_id='11', group='PCP', evidence_id=evidence_id,
+            row=[], status=status, **fields
+        )
+
+    def test_queued_job_stays_in_flight(self):
+        job = self.job('1', 'pending')
+
+        self.assertEqual(in_flight_job('PCP', '1'), job)
+
+    def test_job_lost_from_the_queue_is_timed_out(self):
+        job = self.job('1', 'pending')
+        MarkingJob.objects.filter(pk=job.pk).update(created_at=self.long_ago)
+
+        self.assertIsNone(in_flight_job('PCP', '1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'timeout')
+        self.assertFalse(serialize_job(job)['data']['submitted'])
+
+    def test_polling_a_job_lost_from_the_queue_ends(self):
+        job = self.job('1', 'pending')
+        MarkingJob.objects.filter(pk=job.pk).update(created_at=self.long_ago)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(f'/api/accounts/mark-evidence/{job.pk}/')
+        self.assertEqual(response.data['status'], 'timeout')
+
+    def test_orphaned_job_is_timed_out_from_submission(self):
+        job = self.job('2', 'processing', submitted_at=self.long_ago)
+
+        self.assertIsNone(in_flight_job('PCP', '2'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'timeout')
+        self.assertTrue(serialize_job(job)['data']['submitted'])
+
+    def test_recent_job_stays_in_flight(self):
+        job = self.job('3', 'processing', submitted_at=timezone.now())
+
+        self.assertEqual(in_flight_job('PCP', '3'), job)
+
+
+class DeduplicatedMarkingTests(TestCase):
+    """A request deduplicated onto another user's job can follow that job"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='x')
+        self.job, _ = submit_marking_job(self.owner, '11', 'PCP', '15009', [])
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='second', password='x'))
+
+    def test_single_mark(self):
+        response = self.client.post('/api/accounts/mark-evidence/', {
+            'student_id': '11', 'group': 'PCP', 'evidence_id': 15009, 'component_id': 7,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['deduplicated'])
+        self.assertEqual(self.client.get(response.data['status_url']).data['job_id'], str(self.job.pk))
+
+    def test_bulk_mark(self):
+        response = self.client.post('/api/accounts/mark-evidence/bulk/', {
+            'student_id': '11', 'group': 'PCP', 'items': [{'evidence_id': 15009, 'component_id': 7}],
+        }, format='json')
+
+        in_flight = response.data['in_flight'][0]
+        self.assertEqual(self.client.get(in_flight['status_url']).status_code, 200)
+
+    def test_other_users_jobs_stay_hidden(self):
+        self.assertEqual(self.client.get(f'/api/accounts/mark-evidence/{self.job.pk}/').status_code, 404)
+
+
+@override_settings(MARKING_WEBHOOK_SECRET='secret', MARKING_WEBHOOK_TOLERANCE=300)
+class MarkingOutputWebhookTests(TestCase):
+    url = '/api/accounts/mark-evidence/output/'
+    body = {'group': 'PCP', 'headers': ['UserId', 'EvidenceId', 'Grade'], 'rows': [['11', '777', 'Pass']]}
+
+    def post(self, body, timestamp=None, secret='secret'):
+        timestamp = str(int(time.time())) if timestamp is None else str(timestamp)
+        raw = json.dumps(body).encode()
+        signature = hmac.new(secret.encode(), timestamp.encode() + b'.' + raw, hashlib.sha256).hexdigest()
+        return APIClient().post(
+            self.url, raw, content_type='application/json',
+            HTTP_X_MARKING_TIMESTAMP=timestamp, HTTP_X_MARKING_SIGNATURE=f'sha256={signature}',
+        )
+
+    def test_pushed_row_is_stored_once(self):
+        self.assertEqual(self.post(self.body).status_code, 200)
+        self.assertEqual(self.post(self.body).status_code, 200)
+        self.assertEqual(MarkingResult.objects.filter(group='PCP', evidence_id='777').count(), 1)
+
+    def test_bad_signature_is_rejected(self):
+        self.assertEqual(self.post(self.body, secret='wrong').status_code, 403)
+
+    def test_stale_timestamp_is_rejected(self):
+        self.assertEqual(self.post(self.body, timestamp=int(time.time()) - 3600).status_code, 403)
+
+    def test_non_object_body_is_rejected(self):
+        self.assertEqual(self.post([self.body]).status_code, 400)
+
+
+class StudentComponentsETagTests(LocalSheetsMixin, TestCase):
+    url = '/api/accounts/student-components/?student_email=a@x.com'
+
+    def setUp(self):
+        super().setUp()
+        evidence = json.dumps([{'Id': 1, 'ComponentId': 7, 'Name': 'E1', 'Status': 'PendingAssessment'}])
+        components = json.dumps([{'componentId': 7, 'componentName': 'Comp'}])
+        self.backend.set_sheet('Students', [['ID', 'Email', 'Name', 'X', 'Group'], ['11', 'a@x.com', 'A', '', 'PCP']])
+        self.backend.set_sheet('PCP', [['ID', 'Email', 'Name', 'Component', 'Evidence'], ['11', 'a@x.com', 'A', components, evidence]])
+        sync_mirror(self.backend)
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='coach', password='x'))
+        patch = mock.patch('accounts.evidence_views.sync_mirror_in_background')
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_unchanged_student_revalidates_without_reading_sheets(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with mock.patch('accounts.evidence_views.get_student_components') as live:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        live.assert_not_called()
+
+    def test_stale_mirror_revalidates_against_live_sheets(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # Sheets changed and the mirror hasn't caught up
+        rows = self.backend.sheet('PCP')
+        rows[1][4] = json.dumps([{'Id': 2, 'ComponentId': 7, 'Name': 'E2', 'Status': 'Accepted'}])
+        self.backend.set_sheet('PCP', rows)
+        SheetSyncState.objects.update(synced_at=timezone.now() - timedelta(days=1))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('E2', response.data['data']['evidence'])
+        self.assertNotEqual(response['ETag'], etag)
+
+        # and the live body's own ETag revalidates
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_changed_student_gets_a_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        rows = self.backend.sheet('PCP')
+        rows[1][4] = json.dumps([{'Id': 2, 'ComponentId': 7, 'Name': 'E2', 'Status': 'Accepted'}])
+        self.backend.set_sheet('PCP', rows)
+        sync_mirror(self.backend)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -1,9 +1,26 @@
 from django.urls import path
 from .views import LoginView
-from .evidence_views import GetStudentComponentsView, MarkEvidenceView
+from .evidence_views import (
+    GetStudentComponentsView,
+    BatchStudentComponentsView,
+    MarkEvidenceView,
+    MarkingJobView,
+    MarkingResultsView,
+    MarkingOutputWebhookView,
+    BulkMarkEvidenceView,
+    MarkingBatchView,
+    marking_job_events,
+)
 
 urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
     path("student-components/", GetStudentComponentsView.as_view(), name="student_components"),
+    path("student-components/batch/", BatchStudentComponentsView.as_view(), name="batch_student_components"),
     path("mark-evidence/", MarkEvidenceView.as_view(), name="mark_evidence"),
+    path("mark-evidence/output/", MarkingOutputWebhookView.as_view(), name="marking_output_webhook"),
+    path("mark-evidence/results/", MarkingResultsView.as_view(), name="marking_results"),
+    path("mark-evidence/<uuid:job_id>/", MarkingJobView.as_view(), name="marking_job"),
+    path("mark-evidence/<uuid:job_id>/events/", marking_job_events, name="marking_job_events"),
+    path("mark-evidence/bulk/", BulkMarkEvidenceView.as_view(), name="bulk_mark_evidence"),
+    path("mark-evidence/bulk/<uuid:batch_id>/", MarkingBatchView.as_view(), name="marking_batch"),
 ]
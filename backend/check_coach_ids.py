@@ -1,4 +1,4 @@
-from tasks.models import CoachData
+from tasks.models import CoachData, Task
 from django.contrib.auth.models import User
 
 print("=" * 60)
@@ -6,8 +6,9 @@ print("COACH DATA TABLE (case_owner_id values)")
 print("=" * 60)
 
 coaches = CoachData.objects.all()[:20]
+coaches_with_tasks = set(Task.objects.values_list('coach_id', flat=True).distinct())
 for c in coaches:
-    has_tasks = "Yes" if c.tasks else "No"
+    has_tasks = "Yes" if c.case_owner_id in coaches_with_tasks else "No"
     print(f"case_owner_id: {c.case_owner_id:5} | has_tasks: {has_tasks}")
 
 print("\n" + "=" * 60)
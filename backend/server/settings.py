@@ -190,3 +190,90 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+# =========================
+# Google Sheets evidence
+# =========================
+# Seconds before the in-memory student directory is rebuilt in the background
+STUDENT_DIRECTORY_TTL = int(os.getenv("STUDENT_DIRECTORY_TTL", "300"))
+
+# Background marking jobs: worker threads per process (held only while a row
+# is appended), and how long a submitted job waits for its "<group> Output"
+# row before timing out (MARKING_MAX_POLLS * MARKING_POLL_INTERVAL seconds)
+MARKING_WORKERS = int(os.getenv("MARKING_WORKERS", "4"))
+MARKING_POLL_INTERVAL = float(os.getenv("MARKING_POLL_INTERVAL", "3"))
+MARKING_MAX_POLLS = int(os.getenv("MARKING_MAX_POLLS", "20"))
+# Processing-sheet appends are batched per group: flushed after this many
+# seconds or once this many rows are queued
+MARKING_APPEND_WINDOW = float(os.getenv("MARKING_APPEND_WINDOW", "0.2"))
+MARKING_APPEND_MAX_ROWS = int(os.getenv("MARKING_APPEND_MAX_ROWS", "50"))
+# Largest number of evidence items accepted by one bulk marking request
+MARKING_BULK_MAX_ITEMS = int(os.getenv("MARKING_BULK_MAX_ITEMS", "200"))
+
+# Sheets backend: "google" (live spreadsheet) or "local" (in-process fake for
+# benchmarks/tests, seeded from SHEETS_LOCAL_PATH and marking appended rows
+# after SHEETS_LOCAL_MARKING_DELAY seconds)
+SHEETS_BACKEND = os.getenv("SHEETS_BACKEND", "google")
+SHEETS_LOCAL_PATH = os.getenv("SHEETS_LOCAL_PATH", "")
+SHEETS_LOCAL_MARKING_DELAY = float(os.getenv("SHEETS_LOCAL_MARKING_DELAY", "5"))
+
+# Google Sheets call wrapper: per-process request budget, retries with
+# exponential backoff + jitter on 429/5xx, and a circuit breaker
+SHEETS_REQUESTS_PER_MINUTE = int(os.getenv("SHEETS_REQUESTS_PER_MINUTE", "240"))
+SHEETS_BUDGET_TIMEOUT = float(os.getenv("SHEETS_BUDGET_TIMEOUT", "30"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "4"))
+SHEETS_BACKOFF_BASE = float(os.getenv("SHEETS_BACKOFF_BASE", "0.5"))
+SHEETS_BACKOFF_MAX = float(os.getenv("SHEETS_BACKOFF_MAX", "16"))
+SHEETS_BREAKER_THRESHOLD = int(os.getenv("SHEETS_BREAKER_THRESHOLD", "5"))
+SHEETS_BREAKER_RESET = float(os.getenv("SHEETS_BREAKER_RESET", "30"))
+
+# Seconds between keepalive comments on marking job event streams; each
+# keepalive also re-reads the job in case it runs in another process
+MARKING_EVENTS_KEEPALIVE = float(os.getenv("MARKING_EVENTS_KEEPALIVE", "15"))
+# Seconds the per-job token in a mark response's events_url can be used to
+# open that job's event stream
+MARKING_EVENTS_TOKEN_MAX_AGE = int(os.getenv("MARKING_EVENTS_TOKEN_MAX_AGE", "60"))
+
+# Database mirror of the evidence spreadsheet (manage.py sync_evidence_mirror);
+# component lookups fall back to live Sheets once it is older than this many seconds
+MIRROR_MAX_AGE = int(os.getenv("MIRROR_MAX_AGE", "900"))
+# Largest number of students accepted by one batch student-components request
+STUDENT_COMPONENTS_BATCH_MAX = int(os.getenv("STUDENT_COMPONENTS_BATCH_MAX", "200"))
+# Most stored marking results returned by one results request
+MARKING_RESULTS_MAX = int(os.getenv("MARKING_RESULTS_MAX", "500"))
+# Extra seconds past its polling deadline (counted from when its row was
+# appended) before a processing marking job is treated as orphaned and the
+# evidence can be submitted again
+MARKING_STALE_GRACE = float(os.getenv("MARKING_STALE_GRACE", "120"))
+# Seconds a marking job may wait in the (in-memory) queue before it is treated
+# as lost to a restart or a crashed worker and timed out
+MARKING_QUEUE_TIMEOUT = float(os.getenv("MARKING_QUEUE_TIMEOUT", "600"))
+
+# Output webhook: the spreadsheet's automation POSTs finished output rows to
+# /api/accounts/mark-evidence/output/ signed with this secret (HMAC-SHA256).
+# While it is set, output sheets are only polled every
+# MARKING_WEBHOOK_POLL_INTERVAL seconds as a safety net
+MARKING_WEBHOOK_SECRET = os.getenv("MARKING_WEBHOOK_SECRET", "")
+MARKING_WEBHOOK_POLL_INTERVAL = float(os.getenv("MARKING_WEBHOOK_POLL_INTERVAL", "15"))
+# Seconds a signed webhook timestamp may be away from the server clock
+MARKING_WEBHOOK_TOLERANCE = int(os.getenv("MARKING_WEBHOOK_TOLERANCE", "300"))
+
+# Column-narrowed reads: seconds a sheet's header row is trusted before the
+# next read of that sheet is a full A:Z read again, and the valueRenderOption
+# sent with every read
+SHEETS_HEADER_TTL = int(os.getenv("SHEETS_HEADER_TTL", "600"))
+SHEETS_VALUE_RENDER_OPTION = os.getenv("SHEETS_VALUE_RENDER_OPTION", "FORMATTED_VALUE")
+
+# Structured evidence (student-components?evidence_format=structured): parsed
+# results kept per student and cell revision, and the largest page served
+EVIDENCE_PARSE_CACHE_SIZE = int(os.getenv("EVIDENCE_PARSE_CACHE_SIZE", "512"))
+EVIDENCE_PAGE_SIZE_MAX = int(os.getenv("EVIDENCE_PAGE_SIZE_MAX", "500"))
+
+# Coach task lists (?limit=&cursor=): default and largest page size
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", "50"))
+TASKS_PAGE_SIZE_MAX = int(os.getenv("TASKS_PAGE_SIZE_MAX", "200"))
+# Delta syncs (?since=): seconds the returned cursor trails the clock, so
+# writes committing during a sync are picked up by the next one
+TASKS_SYNC_OVERLAP = int(os.getenv("TASKS_SYNC_OVERLAP", "5"))
+# Largest number of operations in one tasks/bulk/ request
+TASKS_BULK_MAX = int(os.getenv("TASKS_BULK_MAX", "200"))
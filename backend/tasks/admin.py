@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("id", "coach_id", "text", "done", "created_at")
+    list_filter = ("done",)
+    search_fields = ("id", "text")
@@ -0,0 +1,178 @@
+"""
+Task list queries
+Filters and keyset (cursor) pagination for a coach's tasks, all done in
+the database. Tasks are ordered newest first on (created_at, id); legacy
+tasks without a created_at come last.
+Delta syncs (?since=) return what changed after an updated_at cursor.
+"""
+import base64
+import json
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task, TaskTombstone
+
+
+TASK_ORDERING = (F("created_at").desc(nulls_last=True), F("id").desc())
+
+TRUE_VALUES = {"1", "true", "yes"}
+FALSE_VALUES = {"0", "false", "no"}
+
+
+def parse_bool(value, name):
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def parse_bound(value, name):
+    """
+    (moment, whole_day) for an ISO datetime, or for an ISO date (its
+    midnight, whole_day=True)
+    """
+    try:
+        day = parse_date(value)
+        whole_day = day is not None
+        moment = datetime.combine(day, time.min) if whole_day else parse_datetime(value)
+        if moment is None:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime")
+
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.get_default_timezone())
+    return moment, whole_day
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the list filters in `params`:
+      done=true|false, has_evidence=true|false,
+      created_from / created_to (ISO date or datetime, both inclusive)
+    """
+    if params.get("done", "") != "":
+        queryset = queryset.filter(done=parse_bool(params["done"], "done"))
+
+    if params.get("has_evidence", "") != "":
+        queryset = queryset.filter(evidence__isnull=not parse_bool(params["has_evidence"], "has_evidence"))
+
+    if params.get("created_from"):
+        moment, _ = parse_bound(params["created_from"], "created_from")
+        queryset = queryset.filter(created_at__gte=moment)
+
+    if params.get("created_to"):
+        moment, whole_day = parse_bound(params["created_to"], "created_to")
+        if whole_day:
+            queryset = queryset.filter(created_at__lt=moment + timedelta(days=1))
+        else:
+            queryset = queryset.filter(created_at__lte=moment)
+
+    return queryset
+
+
+def encode_cursor(task):
+    raw = json.dumps([task.created_at.isoformat() if task.created_at else None, task.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(created_at or None, id) of the last task of the previous page"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at)
+        return created_at, str(task_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(queryset, cursor):
+    """Tasks that come after the cursor in TASK_ORDERING"""
+    created_at, task_id = decode_cursor(cursor)
+    if created_at is None:
+        return queryset.filter(created_at__isnull=True, id__lt=task_id)
+
+    return queryset.filter(
+        Q(created_at__lt=created_at)
+        | Q(created_at=created_at, id__lt=task_id)
+        | Q(created_at__isnull=True)
+    )
+
+
+def page_size(params):
+    default = getattr(settings, "TASKS_PAGE_SIZE", 50)
+    limit = getattr(settings, "TASKS_PAGE_SIZE_MAX", 200)
+    try:
+        size = int(params.get("limit") or default)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return max(1, min(size, limit))
+
+
+def wants_page(params):
+    """Paginated envelope only when asked for; plain requests keep getting the bare list"""
+    return "limit" in params or "cursor" in params
+
+
+def coach_tasks(coach_id, params):
+    return filter_tasks(Task.objects.filter(coach_id=coach_id), params).order_by(*TASK_ORDERING)
+
+
+def task_page(queryset, params):
+    """(tasks, next_cursor) - one page of an ordered queryset"""
+    if params.get("cursor"):
+        queryset = after_cursor(queryset, params["cursor"])
+
+    size = page_size(params)
+    # one extra row tells whether there is a next page
+    tasks = list(queryset[:size + 1])
+    if len(tasks) <= size:
+        return tasks, None
+
+    tasks = tasks[:size]
+    return tasks, encode_cursor(tasks[-1])
+
+
+def sync_cursor():
+    """
+    Cursor for the next delta sync. It trails the clock a little so a write
+    stamped just before this read but committed after it is not skipped;
+    clients may see such a change twice, never zero times
+    """
+    overlap = getattr(settings, "TASKS_SYNC_OVERLAP", 5)
+    cursor = timezone.now() - timedelta(seconds=overlap)
+    # "Z" rather than "+00:00", which doesn't survive an unencoded query string
+    return cursor.astimezone(dt_timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def parse_since(value):
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValueError("since must be a cursor from a previous response")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, timezone.get_default_timezone())
+    return since
+
+
+def changes_since(coach_id, since):
+    """(tasks created or updated at/after `since`, ids of tasks deleted at/after it)"""
+    since = parse_since(since)
+    changed = Task.objects.filter(coach_id=coach_id, updated_at__gte=since).order_by("updated_at", "id")
+    deleted = (
+        TaskTombstone.objects
+        .filter(coach_id=coach_id, deleted_at__gte=since)
+        .order_by("deleted_at")
+        .values_list("task_id", flat=True)
+    )
+    return list(changed), list(deleted)
@@ -0,0 +1,87 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:02
+
+import json
+import uuid
+
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+import tasks.models
+
+
+TASK_FIELDS = {"id", "text", "done", "evidence", "created_at", "updated_at"}
+
+
+def _timestamp(value):
+    try:
+        return parse_datetime(value) if isinstance(value, str) and value else None
+    except ValueError:
+        return None
+
+
+def copy_json_tasks(apps, schema_editor):
+    """Move every task of coaches_data.tasks into its own coach_tasks row"""
+    connection = schema_editor.connection
+    # coaches_data is unmanaged; fresh databases don't have it
+    if "coaches_data" not in connection.introspection.table_names():
+        return
+
+    Task = apps.get_model("tasks", "Task")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT case_owner_id, tasks FROM coaches_data")
+        coaches = cursor.fetchall()
+
+    seen = set(Task.objects.values_list("id", flat=True))
+    rows = []
+    for coach_id, raw_tasks in coaches:
+        if isinstance(raw_tasks, str):
+            raw_tasks = json.loads(raw_tasks or "[]")
+        for t in raw_tasks if isinstance(raw_tasks, list) else []:
+            if not isinstance(t, dict):
+                t = {"text": str(t)}
+
+            task_id = str(t.get("id") or "")[:64]
+            if not task_id or task_id in seen:
+                task_id = uuid.uuid4().hex
+            seen.add(task_id)
+
+            rows.append(Task(
+                id=task_id,
+                coach_id=coach_id,
+                text=str(t.get("text") or ""),
+                done=bool(t.get("done")),
+                evidence=t.get("evidence"),
+                extra={k: v for k, v in t.items() if k not in TASK_FIELDS},
+                created_at=_timestamp(t.get("created_at")),
+                updated_at=_timestamp(t.get("updated_at")),
+            ))
+
+    Task.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.CharField(default=tasks.models.new_task_id, editable=False, max_length=64, primary_key=True, serialize=False)),
+                ('coach_id', models.IntegerField()),
+                ('text', models.TextField()),
+                ('done', models.BooleanField(default=False)),
+                ('evidence', models.JSONField(blank=True, null=True)),
+                ('extra', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'coach_tasks',
+                'indexes': [models.Index(fields=['coach_id', '-created_at'], name='coach_task_created_idx')],
+            },
+        ),
+        migrations.RunPython(copy_json_tasks, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
+import uuid
+
 from django.db import models
 
 # Create your models here.
-# import uuid
 
 class CoachData(models.Model):
     # id
@@ -15,3 +16,57 @@ class CoachData(models.Model):
 
     def __str__(self):
         return str(self.case_owner_id)
+
+
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+class Task(models.Model):
+    """
+    One coach task, in its own row
+    Replaces the list in CoachData.tasks so a single write touches one row
+    """
+    # legacy ids from the JSON list are kept, new tasks get a uuid4 hex
+    id = models.CharField(max_length=64, primary_key=True, default=new_task_id, editable=False)
+    # CoachData.case_owner_id (coaches_data is unmanaged, so no FK)
+    coach_id = models.IntegerField()
+
+    text = models.TextField()
+    done = models.BooleanField(default=False)
+    evidence = models.JSONField(null=True, blank=True)
+    # keys of migrated tasks that have no column of their own
+    extra = models.JSONField(default=dict, blank=True)
+
+    # legacy tasks may have no timestamps
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "coach_tasks"
+        indexes = [
+            # list ordering and keyset pagination on (created_at, id)
+            models.Index(fields=["coach_id", "-created_at", "-id"], name="coach_task_list_idx"),
+            # delta syncs (?since=)
+            models.Index(fields=["coach_id", "updated_at"], name="coach_task_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.coach_id}: {self.text[:50]}"
+
+
+class TaskTombstone(models.Model):
+    """A deleted task, so delta syncs (?since=) can tell clients to drop it"""
+    id = models.BigAutoField(primary_key=True)
+    task_id = models.CharField(max_length=64)
+    coach_id = models.IntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "coach_task_tombstones"
+        indexes = [
+            models.Index(fields=["coach_id", "deleted_at"], name="coach_task_tombstone_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.coach_id}: {self.task_id} deleted"
@@ -0,0 +1,122 @@
+"""
+Bulk task mutations
+A list of create / update / delete operations for one coach, applied in
+one transaction with one statement per kind of write
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+from .serializers import CoachTaskCreateSerializer, CoachTaskUpdateSerializer
+
+
+UPDATE_FIELDS = ("text", "done", "evidence")
+
+
+def validate_operations(operations):
+    """
+    [(op, id, data), ...] for the raw operations, or raise ValueError with
+    {index: errors} for every invalid one
+    """
+    parsed = []
+    errors = {}
+    for i, raw in enumerate(operations):
+        if not isinstance(raw, dict):
+            errors[i] = {"op": ["Must be an object"]}
+            continue
+
+        op = raw.get("op")
+        task_id = str(raw.get("id") or "")
+
+        if op == "create":
+            s = CoachTaskCreateSerializer(data=raw)
+        elif op == "update":
+            s = CoachTaskUpdateSerializer(data=raw)
+        elif op == "delete":
+            s = None
+        else:
+            errors[i] = {"op": ["Must be create, update or delete"]}
+            continue
+
+        if op != "create" and not task_id:
+            errors[i] = {"id": ["This field is required."]}
+            continue
+
+        if s is not None and not s.is_valid():
+            errors[i] = s.errors
+            continue
+
+        parsed.append((op, task_id, dict(s.validated_data) if s is not None else {}))
+
+    if errors:
+        raise ValueError(errors)
+    return parsed
+
+
+def apply_operations(coach_id, operations):
+    """
+    Apply validated operations in order
+    Returns one (op, status_code, task or None, task_id) per operation;
+    updates and deletes of unknown tasks are 404 and don't stop the rest
+    """
+    results = []
+    created = []
+    updated = {}
+    deleted = []
+    update_fields = set()
+
+    with transaction.atomic():
+        ids = {task_id for op, task_id, _ in operations if op != "create"}
+        # locked so concurrent single-task writes wait for this batch
+        existing = {
+            task.id: task
+            for task in Task.objects.select_for_update().filter(coach_id=coach_id, id__in=ids)
+        }
+        # stamped once the locks are held, so a batch that waited on a
+        # concurrent write doesn't go in with an older time than it
+        now = timezone.now()
+
+        for op, task_id, data in operations:
+            if op == "create":
+                task = Task(
+                    coach_id=coach_id,
+                    text=data["text"],
+                    done=False,
+                    evidence=data.get("evidence", None),
+                    created_at=now,
+                    updated_at=now,
+                )
+                created.append(task)
+                results.append((op, 201, task, task.id))
+                continue
+
+            task = existing.get(task_id)
+            if task is None:
+                results.append((op, 404, None, task_id))
+                continue
+
+            if op == "update":
+                for name in UPDATE_FIELDS:
+                    if name in data:
+                        setattr(task, name, data[name])
+                        update_fields.add(name)
+                task.updated_at = now
+                updated[task_id] = task
+                results.append((op, 200, task, task_id))
+            else:
+                del existing[task_id]
+                updated.pop(task_id, None)
+                deleted.append(task_id)
+                results.append((op, 204, None, task_id))
+
+        if created:
+            Task.objects.bulk_create(created)
+        if updated:
+            Task.objects.bulk_update(updated.values(), sorted(update_fields) + ["updated_at"])
+        if deleted:
+            Task.objects.filter(coach_id=coach_id, id__in=deleted).delete()
+            TaskTombstone.objects.bulk_create(
+                TaskTombstone(task_id=task_id, coach_id=coach_id, deleted_at=now) for task_id in deleted
+            )
+
+    return results
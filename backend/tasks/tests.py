@@ -0,0 +1,325 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import CoachData, Task, TaskTombstone
+
+
+COACH_ID = 4242
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "row locking needs PostgreSQL")
+class ConcurrentTaskWritesTests(TransactionTestCase):
+    """Parallel clients writing tasks of the same coach must not lose updates"""
+
+    def setUp(self):
+        # coaches_data is unmanaged, so the test database doesn't have it
+        self.created_coaches_table = "coaches_data" not in connection.introspection.table_names()
+        if self.created_coaches_table:
+            with connection.schema_editor() as editor:
+                editor.create_model(CoachData)
+        CoachData.objects.create(case_owner_id=COACH_ID, tasks=[])
+
+        self.user = User.objects.create_user(username="qa_concurrency", password="x")
+        # the post_save signal made a coach profile
+        self.user.profile.role = "qa"
+        self.user.profile.save(update_fields=["role"])
+
+    def tearDown(self):
+        if self.created_coaches_table:
+            with connection.schema_editor() as editor:
+                editor.delete_model(CoachData)
+        else:
+            CoachData.objects.filter(case_owner_id=COACH_ID).delete()
+
+    def run_parallel(self, requests):
+        """Fire every request from its own thread and client at the same moment"""
+        barrier = threading.Barrier(len(requests))
+        statuses = [None] * len(requests)
+
+        def worker(i, request):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                statuses[i] = request(client).status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i, r)) for i, r in enumerate(requests)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return statuses
+
+    def url(self, task_id=None):
+        base = f"/tasks-api/coaches/{COACH_ID}/tasks/"
+        return f"{base}{task_id}/" if task_id else base
+
+    def test_parallel_creates_are_all_kept(self):
+        statuses = self.run_parallel([
+            (lambda c, i=i: c.post(self.url(), {"text": f"task {i}"}, format="json"))
+            for i in range(10)
+        ])
+
+        self.assertEqual(statuses, [201] * 10)
+        self.assertEqual(Task.objects.filter(coach_id=COACH_ID).count(), 10)
+
+    def test_parallel_updates_of_different_tasks(self):
+        tasks = [Task.objects.create(coach_id=COACH_ID, text=f"task {i}") for i in range(10)]
+
+        statuses = self.run_parallel([
+            (lambda c, t=t: c.patch(self.url(t.id), {"done": True}, format="json"))
+            for t in tasks
+        ])
+
+        self.assertEqual(statuses, [200] * 10)
+        self.assertFalse(Task.objects.filter(coach_id=COACH_ID, done=False).exists())
+
+    def test_parallel_updates_of_different_fields(self):
+        task = Task.objects.create(coach_id=COACH_ID, text="before")
+
+        statuses = self.run_parallel([
+            lambda c: c.patch(self.url(task.id), {"text": "after"}, format="json"),
+            lambda c: c.patch(self.url(task.id), {"done": True}, format="json"),
+            lambda c: c.patch(self.url(task.id), {"evidence": {"reviewed": True}}, format="json"),
+        ])
+
+        self.assertEqual(statuses, [200] * 3)
+        task.refresh_from_db()
+        self.assertEqual((task.text, task.done, task.evidence), ("after", True, {"reviewed": True}))
+
+    def test_update_racing_a_delete(self):
+        task = Task.objects.create(coach_id=COACH_ID, text="doomed")
+
+        statuses = self.run_parallel([
+            lambda c: c.patch(self.url(task.id), {"done": True}, format="json"),
+            lambda c: c.delete(self.url(task.id)),
+        ])
+
+        self.assertIn(statuses[0], (200, 404))
+        self.assertEqual(statuses[1], 204)
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    def test_update_waits_for_a_locked_task(self):
+        task = Task.objects.create(coach_id=COACH_ID, text="before")
+        locked = threading.Event()
+        release = threading.Event()
+        responses = []
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    held = Task.objects.select_for_update().get(pk=task.pk)
+                    locked.set()
+                    release.wait(10)
+                    held.text = "committed"
+                    held.save(update_fields=["text"])
+            finally:
+                connection.close()
+
+        def patch():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                responses.append(client.patch(self.url(task.id), {"done": True}, format="json"))
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        patcher = threading.Thread(target=patch)
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            patcher.start()
+            patcher.join(0.5)
+            self.assertTrue(patcher.is_alive(), "PATCH didn't wait for the row lock")
+        finally:
+            release.set()
+            holder.join()
+            if patcher.ident is not None:
+                patcher.join(10)
+
+        # The PATCH read the task only after the holder committed
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual((responses[0].json()["text"], responses[0].json()["done"]), ("committed", True))
+        task.refresh_from_db()
+        self.assertEqual((task.text, task.done), ("committed", True))
+
+
+class CoachTasksTestCase(TestCase):
+    """Task API tests on any database, as a QA user"""
+
+    @classmethod
+    def setUpClass(cls):
+        # coaches_data is unmanaged, so the test database doesn't have it;
+        # created outside the class transaction (sqlite can't alter inside one)
+        cls.created_coaches_table = "coaches_data" not in connection.introspection.table_names()
+        if cls.created_coaches_table:
+            with connection.schema_editor() as editor:
+                editor.create_model(CoachData)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.created_coaches_table:
+            with connection.schema_editor() as editor:
+                editor.delete_model(CoachData)
+
+    @classmethod
+    def setUpTestData(cls):
+        CoachData.objects.create(case_owner_id=COACH_ID, tasks=[])
+        cls.user = User.objects.create_user(username="qa_tasks", password="x")
+        cls.user.profile.role = "qa"
+        cls.user.profile.save(update_fields=["role"])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def url(self, suffix=""):
+        return f"/tasks-api/coaches/{COACH_ID}/tasks/{suffix}"
+
+    def task(self, text, created_at=None, **fields):
+        return Task.objects.create(
+            coach_id=COACH_ID, text=text, created_at=created_at, updated_at=created_at, **fields
+        )
+
+
+class TaskListTests(CoachTasksTestCase):
+    def moment(self, *args):
+        return timezone.make_aware(datetime(*args), timezone.get_default_timezone())
+
+    def test_pages_cover_every_task_once(self):
+        same = self.moment(2026, 3, 10, 9, 0)
+        expected = [self.task(f"same {i}", same).id for i in range(3)]
+        expected = [self.task("newest", same + timedelta(hours=1)).id] + sorted(expected, reverse=True)
+        expected += sorted((self.task(f"legacy {i}").id for i in range(3)), reverse=True)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = self.client.get(self.url(), params).json()
+            seen += [t["id"] for t in page["results"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        # newest first, ties broken by id, tasks without created_at last
+        self.assertEqual(seen, expected)
+
+    def test_created_to_date_includes_the_whole_day(self):
+        late = self.task("late", self.moment(2026, 3, 10, 23, 30))
+        self.task("next day", self.moment(2026, 3, 11, 0, 30))
+
+        response = self.client.get(self.url(), {"created_to": "2026-03-10"})
+        self.assertEqual([t["id"] for t in response.json()], [late.id])
+
+    def test_filters(self):
+        done = self.task("done", self.moment(2026, 3, 10, 9, 0), done=True, evidence={"file": "a"})
+        self.task("open", self.moment(2026, 3, 10, 10, 0))
+
+        response = self.client.get(self.url(), {"done": "true", "has_evidence": "yes"})
+        self.assertEqual([t["id"] for t in response.json()], [done.id])
+
+    def test_bad_parameters_are_rejected(self):
+        for params in ({"cursor": "not-a-cursor"}, {"done": "maybe"}, {"created_from": "yesterday"}, {"limit": "ten"}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url(), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("detail", response.json())
+
+
+class TaskDeltaSyncTests(CoachTasksTestCase):
+    def test_changes_since_a_sync_cursor(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        untouched = self.task("untouched", long_ago)
+        edited = self.task("edited", long_ago)
+        removed = self.task("removed", long_ago)
+
+        cursor = self.client.get(self.url(), {"limit": 10}).json()["sync_cursor"]
+
+        created = self.client.post(self.url(), {"text": "created"}, format="json").json()
+        self.client.patch(self.url(f"{edited.id}/"), {"done": True}, format="json")
+        self.client.delete(self.url(f"{removed.id}/"))
+
+        response = self.client.get(self.url(), {"since": cursor})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        changed = {t["id"]: t for t in data["changed"]}
+        self.assertEqual(set(changed), {created["id"], edited.id})
+        self.assertNotIn(untouched.id, changed)
+        self.assertTrue(changed[edited.id]["done"])
+        self.assertEqual(data["deleted"], [removed.id])
+        self.assertTrue(data["sync_cursor"])
+
+    def test_malformed_since_is_rejected(self):
+        response = self.client.get(self.url(), {"since": "last tuesday"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskBulkTests(CoachTasksTestCase):
+    def bulk(self, *operations):
+        return self.client.post(self.url("bulk/"), {"operations": list(operations)}, format="json")
+
+    def test_invalid_operation_rejects_the_whole_batch(self):
+        task = self.task("keep")
+
+        response = self.bulk(
+            {"op": "create", "text": "new"},
+            {"op": "delete", "id": task.id},
+            {"op": "update"},
+            {"op": "rename", "id": task.id},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"2", "3"})
+        self.assertEqual(list(Task.objects.filter(coach_id=COACH_ID).values_list("text", flat=True)), ["keep"])
+        self.assertFalse(TaskTombstone.objects.exists())
+
+    def test_unknown_ids_dont_stop_the_rest(self):
+        task = self.task("before")
+
+        response = self.bulk(
+            {"op": "update", "id": "missing", "done": True},
+            {"op": "update", "id": task.id, "text": "after"},
+            {"op": "delete", "id": "missing"},
+            {"op": "create", "text": "new"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["status"] for r in response.json()["results"]], [404, 200, 404, 201])
+        task.refresh_from_db()
+        self.assertEqual(task.text, "after")
+        self.assertTrue(Task.objects.filter(coach_id=COACH_ID, text="new").exists())
+
+    def test_update_after_delete_of_the_same_task(self):
+        task = self.task("doomed")
+
+        response = self.bulk(
+            {"op": "delete", "id": task.id},
+            {"op": "update", "id": task.id, "done": True},
+        )
+
+        self.assertEqual([r["status"] for r in response.json()["results"]], [204, 404])
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    def test_deleted_tasks_get_tombstones(self):
+        tasks = [self.task(f"task {i}") for i in range(2)]
+
+        self.bulk(*({"op": "delete", "id": t.id} for t in tasks))
+
+        self.assertFalse(Task.objects.filter(coach_id=COACH_ID).exists())
+        self.assertEqual(
+            set(TaskTombstone.objects.filter(coach_id=COACH_ID).values_list("task_id", flat=True)),
+            {t.id for t in tasks},
+        )
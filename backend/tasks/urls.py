@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import CoachTasksView, CoachTaskDetailView, EvidenceUploadView
+from .views import CoachTasksView, CoachTaskBulkView, CoachTaskDetailView, EvidenceUploadView
 
 urlpatterns = [
     path("coaches/<str:coach_id>/tasks/", CoachTasksView.as_view()),
+    path("coaches/<str:coach_id>/tasks/bulk/", CoachTaskBulkView.as_view()),
     path("coaches/<str:coach_id>/tasks/<str:task_id>/", CoachTaskDetailView.as_view()),
     path("evidence/upload/", EvidenceUploadView.as_view()),
 ]
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.files.storage import default_storage
@@ -11,7 +12,9 @@ from rest_framework.permissions import IsAuthenticated
 
 import uuid
 
-from .models import CoachData
+from .listing import changes_since, coach_tasks, sync_cursor, task_page, wants_page
+from .models import CoachData, Task, TaskTombstone
+from .operations import apply_operations, validate_operations
 from .serializers import CoachTaskCreateSerializer, CoachTaskUpdateSerializer
 
 import os
@@ -22,24 +25,23 @@ from django.core.files.storage import FileSystemStorage
 from django.utils.text import get_valid_filename
 
 
-def _ensure_list(value):
-    return value if isinstance(value, list) else []
+def _iso(value):
+    return value.isoformat() if value else ""
 
 
-def _normalize_tasks(raw_tasks):
-    tasks = []
-    for t in _ensure_list(raw_tasks):
-        if isinstance(t, dict):
-            tasks.append(t)
-        else:
-            tasks.append({
-                "id": uuid.uuid4().hex,
-                "text": str(t),
-                "done": False,
-                "created_at": "",
-                "updated_at": "",
-            })
-    return tasks
+def _serialize_task(task):
+    """Same shape the tasks had in the CoachData.tasks list"""
+    data = dict(task.extra or {})
+    data.update({
+        "id": task.id,
+        "text": task.text,
+        "done": task.done,
+        "created_at": _iso(task.created_at),
+        "updated_at": _iso(task.updated_at),
+    })
+    if task.evidence is not None:
+        data["evidence"] = task.evidence
+    return data
 
 
 def _guard_coach_scope(request, coach_id: str):
@@ -72,6 +74,9 @@ def _guard_coach_scope(request, coach_id: str):
 class CoachTasksView(APIView):
     """
     GET  /tasks-api/coaches/<coach_id>/tasks
+         ?done=&has_evidence=&created_from=&created_to=   (filters, optional)
+         ?limit=&cursor=   -> { "results": [...], "next_cursor": "..." | null, "sync_cursor": "..." }
+         ?since=<sync_cursor>   -> { "changed": [...], "deleted": [task_id, ...], "sync_cursor": "..." }
     POST /tasks-api/coaches/<coach_id>/tasks
          body: { "text": "...", "evidence": {...} }   (evidence optional)
     """
@@ -82,45 +87,55 @@ class CoachTasksView(APIView):
         if guard:
             return guard
 
-        coach = get_object_or_404(CoachData, case_owner_id=coach_id)
+        get_object_or_404(CoachData, case_owner_id=coach_id)
 
-        tasks = _normalize_tasks(coach.tasks)
-        tasks_sorted = sorted(tasks, key=lambda t: t.get("created_at") or "", reverse=True)
-
-        return Response(tasks_sorted, status=status.HTTP_200_OK)
+        params = request.query_params
+        # the cursor is taken before reading so nothing written meanwhile is missed
+        cursor = sync_cursor()
+        try:
+            if "since" in params:
+                changed, deleted = changes_since(coach_id, params["since"])
+                return Response(
+                    {"changed": [_serialize_task(t) for t in changed], "deleted": deleted, "sync_cursor": cursor},
+                    status=status.HTTP_200_OK
+                )
+
+            tasks = coach_tasks(coach_id, params)
+            if not wants_page(params):
+                return Response([_serialize_task(t) for t in tasks], status=status.HTTP_200_OK)
+
+            tasks, next_cursor = task_page(tasks, params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"results": [_serialize_task(t) for t in tasks], "next_cursor": next_cursor, "sync_cursor": cursor},
+            status=status.HTTP_200_OK
+        )
 
     def post(self, request, coach_id: str):
         guard = _guard_coach_scope(request, coach_id)
         if guard:
             return guard
 
-        coach = get_object_or_404(CoachData, case_owner_id=coach_id)
+        get_object_or_404(CoachData, case_owner_id=coach_id)
 
         s = CoachTaskCreateSerializer(data=request.data)
         s.is_valid(raise_exception=True)
 
-        now_iso = timezone.now().isoformat()
-
-        new_task = {
-            "id": uuid.uuid4().hex,
-            "text": s.validated_data["text"],
-            "done": False,
-            "created_at": now_iso,
-            "updated_at": now_iso,
-        }
+        now = timezone.now()
 
         # evidence optional
-        evidence = s.validated_data.get("evidence", None)
-        if evidence is not None:
-            new_task["evidence"] = evidence
-
-        tasks = _normalize_tasks(coach.tasks)
-        tasks.insert(0, new_task)
+        task = Task.objects.create(
+            coach_id=coach_id,
+            text=s.validated_data["text"],
+            done=False,
+            evidence=s.validated_data.get("evidence", None),
+            created_at=now,
+            updated_at=now,
+        )
 
-        coach.tasks = tasks
-        coach.save(update_fields=["tasks"])
-
-        return Response(new_task, status=status.HTTP_201_CREATED)
+        return Response(_serialize_task(task), status=status.HTTP_201_CREATED)
 
 
 class CoachTaskDetailView(APIView):
@@ -136,54 +151,100 @@ class CoachTaskDetailView(APIView):
         if guard:
             return guard
 
-        coach = get_object_or_404(CoachData, case_owner_id=coach_id)
-        tasks = _normalize_tasks(coach.tasks)
-
-        idx = next((i for i, t in enumerate(tasks) if str(t.get("id")) == str(task_id)), None)
-        if idx is None:
-            return Response({"detail": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        get_object_or_404(CoachData, case_owner_id=coach_id)
 
         s = CoachTaskUpdateSerializer(data=request.data)
         s.is_valid(raise_exception=True)
         data = s.validated_data
 
-        task = tasks[idx]
-
-        if "text" in data:
-            task["text"] = data["text"]
-        if "done" in data:
-            task["done"] = data["done"]
-
         # allow updating evidence if provided
-        if "evidence" in data:
-            task["evidence"] = data["evidence"]
+        fields = [name for name in ("text", "done", "evidence") if name in data]
 
-        task["updated_at"] = timezone.now().isoformat()
+        # Row lock for the read-modify-write: concurrent writes to the same
+        # task queue up instead of overwriting each other, and only the
+        # fields sent in this request are written
+        with transaction.atomic():
+            task = Task.objects.select_for_update().filter(coach_id=coach_id, id=task_id).first()
+            if task is None:
+                return Response({"detail": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        tasks[idx] = task
-        coach.tasks = tasks
-        coach.save(update_fields=["tasks"])
+            for name in fields:
+                setattr(task, name, data[name])
 
-        return Response(task, status=status.HTTP_200_OK)
+            task.updated_at = timezone.now()
+            task.save(update_fields=fields + ["updated_at"])
+
+        return Response(_serialize_task(task), status=status.HTTP_200_OK)
 
     def delete(self, request, coach_id: str, task_id: str):
         guard = _guard_coach_scope(request, coach_id)
         if guard:
             return guard
 
-        coach = get_object_or_404(CoachData, case_owner_id=coach_id)
-        tasks = _normalize_tasks(coach.tasks)
+        get_object_or_404(CoachData, case_owner_id=coach_id)
 
-        new_tasks = [t for t in tasks if str(t.get("id")) != str(task_id)]
-        if len(new_tasks) == len(tasks):
-            return Response({"detail": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            deleted, _ = Task.objects.filter(coach_id=coach_id, id=task_id).delete()
+            if not deleted:
+                return Response({"detail": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        coach.tasks = new_tasks
-        coach.save(update_fields=["tasks"])
+            # tells delta syncs (?since=) to drop the task
+            TaskTombstone.objects.create(task_id=task_id, coach_id=coach_id, deleted_at=timezone.now())
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class CoachTaskBulkView(APIView):
+    """
+    POST /tasks-api/coaches/<coach_id>/tasks/bulk
+         body: { "operations": [
+                   { "op": "create", "text": "...", "evidence"?: {...} },
+                   { "op": "update", "id": "...", "text"?: "...", "done"?: true/false, "evidence"?: {...} },
+                   { "op": "delete", "id": "..." }
+                 ] }
+    All operations run in one transaction; an invalid one rejects the whole
+    batch (400), unknown task ids are reported per operation (404)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, coach_id: str):
+        guard = _guard_coach_scope(request, coach_id)
+        if guard:
+            return guard
+
+        get_object_or_404(CoachData, case_owner_id=coach_id)
+
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response({"detail": "operations must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = getattr(settings, "TASKS_BULK_MAX", 200)
+        if len(operations) > limit:
+            return Response(
+                {"detail": f"At most {limit} operations per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            parsed = validate_operations(operations)
+        except ValueError as e:
+            return Response(
+                {"detail": "Invalid operations", "errors": e.args[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = []
+        for op, code, task, task_id in apply_operations(coach_id, parsed):
+            result = {"op": op, "id": task_id, "status": code}
+            if task is not None:
+                result["task"] = _serialize_task(task)
+            if code == status.HTTP_404_NOT_FOUND:
+                result["detail"] = "Task not found"
+            results.append(result)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 class EvidenceUploadView(APIView):
     """
     POST /tasks-api/evidence/upload
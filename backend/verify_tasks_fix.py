@@ -1,5 +1,5 @@
 from django.contrib.auth import authenticate
-from tasks.models import CoachData
+from tasks.models import CoachData, Task
 
 print("=" * 80)
 print("TESTING TASKS API FIX")
@@ -19,9 +19,10 @@ if user:
     # Check if CoachData exists
     try:
         coach_data = CoachData.objects.get(case_owner_id=user.profile.coach_id)
+        tasks = Task.objects.filter(coach_id=coach_data.case_owner_id).order_by('-created_at')
         print(f"\n✓ CoachData found for ID {user.profile.coach_id}")
-        print(f"  Tasks count: {len(coach_data.tasks) if coach_data.tasks else 0}")
-        print(f"  Tasks: {coach_data.tasks}")
+        print(f"  Tasks count: {tasks.count()}")
+        print(f"  Tasks: {list(tasks.values('id', 'text', 'done'))}")
         
         print("\n✓ Tasks API will now work!")
         print(f"  Endpoint: GET /tasks-api/coaches/{user.profile.coach_id}/tasks/")
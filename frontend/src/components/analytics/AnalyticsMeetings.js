@@ -377,6 +377,8 @@ export default function AnalyticsMeetings({ onOpenSidebar }) {
             else {
                 throw new Error("Student email or ID is required");
             }
+            // Evidence comes back parsed and grouped by component
+            params.append("evidence_format", "structured");
             const response = await fetch(`/api/accounts/student-components/?${params}`, {
                 headers: {
                     "Authorization": `Bearer ${token}`,
@@ -425,6 +427,53 @@ export default function AnalyticsMeetings({ onOpenSidebar }) {
         }
         return [];
     };
+    // Evidence items from a student-components result (structured or raw cell)
+    const getEvidenceItems = (data) => {
+        if (data?.evidence_parsed) {
+            return (data.evidence_parsed.groups || []).flatMap((group) => group.items || []);
+        }
+        return parseEvidenceData(data?.evidence);
+    };
+    // Poll a marking job until it settles
+    const pollMarkingJob = async (jobId, token) => {
+        while (true) {
+            await new Promise((resolve) => setTimeout(resolve, 3000));
+            const statusResponse = await fetch(`/api/accounts/mark-evidence/${jobId}/`, {
+                headers: {
+                    "Authorization": `Bearer ${token}`,
+                    "Content-Type": "application/json",
+                },
+            });
+            if (!statusResponse.ok) {
+                const errorData = await statusResponse.json().catch(() => ({}));
+                throw new Error(errorData.error || `HTTP ${statusResponse.status}`);
+            }
+            const job = await statusResponse.json();
+            if (job.status !== "pending" && job.status !== "processing") {
+                return job;
+            }
+        }
+    };
+    // Stream a marking job's events until it settles, falling back to polling
+    // (the events URL carries a short-lived token for this job, not the access token)
+    const waitForMarkingJob = (jobId, eventsUrl, token) => new Promise((resolve, reject) => {
+        if (!eventsUrl) {
+            pollMarkingJob(jobId, token).then(resolve, reject);
+            return;
+        }
+        const source = new EventSource(eventsUrl);
+        const finish = (event) => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        };
+        source.addEventListener("result", finish);
+        source.addEventListener("timeout", finish);
+        source.addEventListener("failed", finish);
+        source.onerror = () => {
+            source.close();
+            pollMarkingJob(jobId, token).then(resolve, reject);
+        };
+    });
     // Handle marking evidence
     const handleMarkEvidence = async (evidenceItem) => {
         if (!evidenceModal.data)
@@ -463,7 +512,14 @@ export default function AnalyticsMeetings({ onOpenSidebar }) {
                 const errorData = await response.json().catch(() => ({}));
                 throw new Error(errorData.error || `HTTP ${response.status}`);
             }
-            const result = await response.json();
+            let result = await response.json();
+            // Marking runs as a background job - wait for it to settle
+            if (result.status === "pending" || result.status === "processing") {
+                result = await waitForMarkingJob(result.job_id, result.events_url, token);
+            }
+            if (result.status === "failed") {
+                throw new Error(result.error || "Failed to mark evidence");
+            }
             setEvidenceModal((prev) => ({
                 ...prev,
                 markingInProgress: null,
@@ -630,8 +686,8 @@ export default function AnalyticsMeetings({ onOpenSidebar }) {
                                                             const url = studentDashboardUrl(s.email);
                                                             window.open(url, "_blank", "noopener,noreferrer");
                                                         }, className: "\r\n                          text-xs px-3 py-1.5 rounded-lg\r\n                          border border-violet-300\r\n                          text-violet-700\r\n                          bg-white/60\r\n                          hover:bg-violet-600 hover:text-white\r\n                          transition\r\n                          ", children: "View dashboard" }), _jsx("button", { onClick: () => handleLoadEvidence(s), className: "\r\n                  text-xs px-3 py-1.5 rounded-lg\r\n                  border border-blue-300\r\n                  text-blue-700\r\n                  bg-white/60\r\n                  hover:bg-blue-600 hover:text-white\r\n                  transition\r\n                ", children: "Load evidences" })] })] }) }, `${s.id}-${s.email}`));
-                            })) : (_jsx("div", { className: "text-sm text-gray-500 text-center mt-10", children: "No students found" })) })] }) })), evidenceModal.open && (_jsx("div", { className: "fixed inset-0 z-50 flex items-center justify-center bg-black/40 backdrop-blur-sm", children: _jsxs("div", { className: "bg-white w-full max-w-3xl max-h-[80vh] rounded-2xl shadow-xl flex flex-col", children: [_jsxs("div", { className: "flex items-center justify-between px-5 py-4 border-b", children: [_jsxs("div", { children: [_jsx("h3", { className: "text-lg font-semibold text-[#442F73]", children: "Student Evidence" }), _jsxs("p", { className: "text-xs text-gray-500", children: [evidenceModal.studentName, " (", evidenceModal.studentEmail || evidenceModal.studentId, ")"] })] }), _jsx("button", { onClick: () => setEvidenceModal({ open: false, loading: false, error: null, data: null }), className: "w-8 h-8 rounded-full flex items-center justify-center bg-[#E9D9BD] hover:bg-[#B27715] text-[#241453] hover:text-white transition", children: "\u2715" })] }), _jsxs("div", { className: "flex-1 overflow-y-auto px-5 py-4 custom-scroll", children: [evidenceModal.loading && (_jsx("div", { className: "flex items-center justify-center py-12", children: _jsxs("div", { className: "text-center", children: [_jsx("div", { className: "inline-block w-8 h-8 border-4 border-[#A880F7] border-t-transparent rounded-full animate-spin mb-3" }), _jsx("p", { className: "text-sm text-gray-600", children: "Loading evidence..." })] }) })), evidenceModal.error && !evidenceModal.loading && (_jsx("div", { className: "bg-red-50 border border-red-200 rounded-lg p-4", children: _jsxs("div", { className: "flex items-start gap-3", children: [_jsx("i", { className: "fa-solid fa-exclamation-circle text-red-500 mt-0.5" }), _jsxs("div", { children: [_jsx("h4", { className: "text-sm font-semibold text-red-800 mb-1", children: "Error" }), _jsx("p", { className: "text-sm text-red-700", children: evidenceModal.error })] })] }) })), evidenceModal.data && !evidenceModal.loading && !evidenceModal.error && (_jsxs("div", { className: "space-y-4", children: [_jsxs("div", { className: "bg-violet-50 rounded-lg p-4 border border-violet-200", children: [_jsx("h4", { className: "text-sm font-semibold text-violet-900 mb-2", children: "Student Information" }), _jsxs("div", { className: "grid grid-cols-2 gap-3 text-sm", children: [_jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "ID:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.student_id || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Email:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.student_email || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Group:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.group || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Sheet:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.target_sheet || "—" })] })] })] }), evidenceModal.data.evidence && (() => {
-                                            const evidenceItems = parseEvidenceData(evidenceModal.data.evidence);
+                            })) : (_jsx("div", { className: "text-sm text-gray-500 text-center mt-10", children: "No students found" })) })] }) })), evidenceModal.open && (_jsx("div", { className: "fixed inset-0 z-50 flex items-center justify-center bg-black/40 backdrop-blur-sm", children: _jsxs("div", { className: "bg-white w-full max-w-3xl max-h-[80vh] rounded-2xl shadow-xl flex flex-col", children: [_jsxs("div", { className: "flex items-center justify-between px-5 py-4 border-b", children: [_jsxs("div", { children: [_jsx("h3", { className: "text-lg font-semibold text-[#442F73]", children: "Student Evidence" }), _jsxs("p", { className: "text-xs text-gray-500", children: [evidenceModal.studentName, " (", evidenceModal.studentEmail || evidenceModal.studentId, ")"] })] }), _jsx("button", { onClick: () => setEvidenceModal({ open: false, loading: false, error: null, data: null }), className: "w-8 h-8 rounded-full flex items-center justify-center bg-[#E9D9BD] hover:bg-[#B27715] text-[#241453] hover:text-white transition", children: "\u2715" })] }), _jsxs("div", { className: "flex-1 overflow-y-auto px-5 py-4 custom-scroll", children: [evidenceModal.loading && (_jsx("div", { className: "flex items-center justify-center py-12", children: _jsxs("div", { className: "text-center", children: [_jsx("div", { className: "inline-block w-8 h-8 border-4 border-[#A880F7] border-t-transparent rounded-full animate-spin mb-3" }), _jsx("p", { className: "text-sm text-gray-600", children: "Loading evidence..." })] }) })), evidenceModal.error && !evidenceModal.loading && (_jsx("div", { className: "bg-red-50 border border-red-200 rounded-lg p-4", children: _jsxs("div", { className: "flex items-start gap-3", children: [_jsx("i", { className: "fa-solid fa-exclamation-circle text-red-500 mt-0.5" }), _jsxs("div", { children: [_jsx("h4", { className: "text-sm font-semibold text-red-800 mb-1", children: "Error" }), _jsx("p", { className: "text-sm text-red-700", children: evidenceModal.error })] })] }) })), evidenceModal.data && !evidenceModal.loading && !evidenceModal.error && (_jsxs("div", { className: "space-y-4", children: [_jsxs("div", { className: "bg-violet-50 rounded-lg p-4 border border-violet-200", children: [_jsx("h4", { className: "text-sm font-semibold text-violet-900 mb-2", children: "Student Information" }), _jsxs("div", { className: "grid grid-cols-2 gap-3 text-sm", children: [_jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "ID:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.student_id || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Email:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.student_email || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Group:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.group || "—" })] }), _jsxs("div", { children: [_jsx("span", { className: "text-gray-600", children: "Sheet:" }), _jsx("span", { className: "ml-2 font-medium", children: evidenceModal.data.target_sheet || "—" })] })] })] }), (evidenceModal.data.evidence || evidenceModal.data.evidence_parsed) && (() => {
+                                            const evidenceItems = getEvidenceItems(evidenceModal.data);
                                             return (_jsxs("div", { className: "bg-green-50 rounded-lg p-4 border border-green-200", children: [_jsxs("h4", { className: "text-sm font-semibold text-green-900 mb-3", children: ["Evidence (", evidenceItems.length, ")"] }), evidenceItems.length === 0 ? (_jsx("div", { className: "bg-white rounded p-3 text-sm text-gray-600", children: "No evidence items found" })) : (_jsx("div", { className: "bg-white rounded-lg overflow-hidden border border-gray-200", children: _jsxs("table", { className: "w-full text-sm", children: [_jsx("thead", { className: "bg-gray-50 border-b border-gray-200", children: _jsxs("tr", { children: [_jsx("th", { className: "text-left px-4 py-2 font-semibold text-gray-700", children: "Evidence Name" }), _jsx("th", { className: "text-left px-4 py-2 font-semibold text-gray-700", children: "Status" }), _jsx("th", { className: "text-left px-4 py-2 font-semibold text-gray-700", children: "Created Date" }), _jsx("th", { className: "text-center px-4 py-2 font-semibold text-gray-700", children: "Action" })] }) }), _jsx("tbody", { children: evidenceItems.map((item) => (_jsxs("tr", { className: "border-b border-gray-100 hover:bg-gray-50", children: [_jsx("td", { className: "px-4 py-3 text-gray-800", children: item.name }), _jsx("td", { className: "px-4 py-3", children: _jsx("span", { className: `inline-block px-2 py-1 rounded text-xs font-medium ${item.status === 'PendingAssessment'
                                                                                         ? 'bg-yellow-100 text-yellow-800'
                                                                                         : item.status === 'Assessed'
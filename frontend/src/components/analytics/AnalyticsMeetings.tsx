@@ -525,6 +525,8 @@ const todoCoachId: number | null =
       } else {
         throw new Error("Student email or ID is required");
       }
+      // Evidence comes back parsed and grouped by component
+      params.append("evidence_format", "structured");
 
       const response = await fetch(`/api/accounts/student-components/?${params}`, {
         headers: {
@@ -578,6 +580,63 @@ const todoCoachId: number | null =
     return [];
   };
 
+  // Evidence items from a student-components result (structured or raw cell)
+  const getEvidenceItems = (data: any) => {
+    if (data?.evidence_parsed) {
+      return (data.evidence_parsed.groups || []).flatMap((group: any) => group.items || []);
+    }
+    return parseEvidenceData(data?.evidence);
+  };
+
+  // Poll a marking job until it settles
+  const pollMarkingJob = async (jobId: string, token: string) => {
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+
+      const statusResponse = await fetch(`/api/accounts/mark-evidence/${jobId}/`, {
+        headers: {
+          "Authorization": `Bearer ${token}`,
+          "Content-Type": "application/json",
+        },
+      });
+
+      if (!statusResponse.ok) {
+        const errorData = await statusResponse.json().catch(() => ({}));
+        throw new Error(errorData.error || `HTTP ${statusResponse.status}`);
+      }
+
+      const job = await statusResponse.json();
+      if (job.status !== "pending" && job.status !== "processing") {
+        return job;
+      }
+    }
+  };
+
+  // Stream a marking job's events until it settles, falling back to polling
+  // (the events URL carries a short-lived token for this job, not the access token)
+  const waitForMarkingJob = (jobId: string, eventsUrl: string | undefined, token: string) =>
+    new Promise<any>((resolve, reject) => {
+      if (!eventsUrl) {
+        pollMarkingJob(jobId, token).then(resolve, reject);
+        return;
+      }
+      const source = new EventSource(eventsUrl);
+
+      const finish = (event: MessageEvent) => {
+        source.close();
+        resolve(JSON.parse(event.data));
+      };
+
+      source.addEventListener("result", finish);
+      source.addEventListener("timeout", finish);
+      source.addEventListener("failed", finish);
+
+      source.onerror = () => {
+        source.close();
+        pollMarkingJob(jobId, token).then(resolve, reject);
+      };
+    });
+
   // Handle marking evidence
   const handleMarkEvidence = async (evidenceItem: any) => {
     if (!evidenceModal.data) return;
@@ -620,7 +679,16 @@ const todoCoachId: number | null =
         throw new Error(errorData.error || `HTTP ${response.status}`);
       }
 
-      const result = await response.json();
+      let result = await response.json();
+
+      // Marking runs as a background job - wait for it to settle
+      if (result.status === "pending" || result.status === "processing") {
+        result = await waitForMarkingJob(result.job_id, result.events_url, token);
+      }
+
+      if (result.status === "failed") {
+        throw new Error(result.error || "Failed to mark evidence");
+      }
 
       setEvidenceModal((prev) => ({
         ...prev,
@@ -1166,8 +1234,8 @@ const todoCoachId: number | null =
                   </div>
 
                   {/* Evidence */}
-                  {evidenceModal.data.evidence && (() => {
-                    const evidenceItems = parseEvidenceData(evidenceModal.data.evidence);
+                  {(evidenceModal.data.evidence || evidenceModal.data.evidence_parsed) && (() => {
+                    const evidenceItems = getEvidenceItems(evidenceModal.data);
                     
                     return (
                       <div className="bg-green-50 rounded-lg p-4 border border-green-200">
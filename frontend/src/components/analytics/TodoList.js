@@ -1,5 +1,5 @@
 import { jsx as _jsx, jsxs as _jsxs } from "react/jsx-runtime";
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 /** ✅ Auth header helper (JWT) */
 function authHeaders(extra) {
     const token = localStorage.getItem("token");
@@ -39,6 +39,7 @@ function isAttendanceTask(t) {
         .includes("attendance follow-up");
     return isAttendanceType || textLooksAttendance;
 }
+const PAGE_SIZE = 50;
 /** ✅ Django origin (local) or production origin */
 const API_ORIGIN = import.meta.env?.VITE_API_ORIGIN?.toString().trim() ||
     "http://127.0.0.1:5055";
@@ -56,24 +57,41 @@ export default function TodoList({ coachId, viewerRole = "coach" }) {
     const [loading, setLoading] = useState(false);
     const [saving, setSaving] = useState(false);
     const [err, setErr] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+    // ✅ cursor for "changes since" syncs when the tab gets focus again
+    const syncCursor = useRef(null);
     // ✅ if not QA/Admin hide Attendance tasks
     const shouldHideAttendance = viewerRole !== "qa" && viewerRole !== "admin";
     // ✅ Add trailing slashes (important for Django/DRF)
     const LIST_URL = `/tasks-api/coaches/${coachId}/tasks/`;
     const DETAIL_URL = (taskId) => `/tasks-api/coaches/${coachId}/tasks/${taskId}/`;
+    const BULK_URL = `/tasks-api/coaches/${coachId}/tasks/bulk/`;
+    const PAGE_URL = (cursor) => `${LIST_URL}?limit=${PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`;
+    const visibleTasks = (arr) => shouldHideAttendance ? arr.filter((t) => !isAttendanceTask(t)) : arr;
+    const fetchPage = async (cursor) => {
+        const data = await http(PAGE_URL(cursor));
+        // older servers answer with the whole list
+        if (Array.isArray(data))
+            return { results: data, next_cursor: null };
+        return {
+            results: data?.results ?? [],
+            next_cursor: data?.next_cursor ?? null,
+            sync_cursor: data?.sync_cursor,
+        };
+    };
     useEffect(() => {
         let cancelled = false;
         async function load() {
             setLoading(true);
             setErr(null);
             try {
-                const data = await http(LIST_URL);
-                const arr = Array.isArray(data) ? data : [];
-                const filtered = shouldHideAttendance
-                    ? arr.filter((t) => !isAttendanceTask(t))
-                    : arr;
-                if (!cancelled)
-                    setTodos(filtered);
+                const page = await fetchPage();
+                if (!cancelled) {
+                    setTodos(visibleTasks(page.results));
+                    setNextCursor(page.next_cursor);
+                    syncCursor.current = page.sync_cursor ?? null;
+                }
             }
             catch (e) {
                 if (!cancelled)
@@ -90,6 +108,56 @@ export default function TodoList({ coachId, viewerRole = "coach" }) {
             cancelled = true;
         };
     }, [coachId, shouldHideAttendance, LIST_URL]);
+    const loadMore = async () => {
+        if (!nextCursor)
+            return;
+        setLoadingMore(true);
+        setErr(null);
+        try {
+            const page = await fetchPage(nextCursor);
+            setTodos((prev) => [...prev, ...visibleTasks(page.results)]);
+            setNextCursor(page.next_cursor);
+        }
+        catch (e) {
+            setErr(e?.message || "Failed to load tasks");
+        }
+        finally {
+            setLoadingMore(false);
+        }
+    };
+    // ✅ apply only what changed since the last sync (no full reload)
+    useEffect(() => {
+        async function syncChanges() {
+            const since = syncCursor.current;
+            if (!since || document.visibilityState !== "visible")
+                return;
+            try {
+                const data = await http(`${LIST_URL}?since=${encodeURIComponent(since)}`);
+                syncCursor.current = data.sync_cursor;
+                setTodos((prev) => {
+                    const gone = new Set(data.deleted);
+                    const changed = new Map(data.changed.map((t) => [t.id, t]));
+                    const kept = prev.filter((t) => !gone.has(t.id)).map((t) => changed.get(t.id) ?? t);
+                    // new tasks go on top; older ones not loaded yet arrive with "Load more"
+                    const known = new Set(prev.map((t) => t.id));
+                    const oldest = prev[prev.length - 1]?.created_at || "";
+                    const added = data.changed
+                        .filter((t) => !known.has(t.id) && (!nextCursor || (t.created_at || "") >= oldest))
+                        .sort((a, b) => (b.created_at || "").localeCompare(a.created_at || ""));
+                    return visibleTasks([...added, ...kept]);
+                });
+            }
+            catch {
+                // keep the list as is; the next focus tries again
+            }
+        }
+        window.addEventListener("focus", syncChanges);
+        document.addEventListener("visibilitychange", syncChanges);
+        return () => {
+            window.removeEventListener("focus", syncChanges);
+            document.removeEventListener("visibilitychange", syncChanges);
+        };
+    }, [LIST_URL, nextCursor, shouldHideAttendance]);
     // ✅ pendingCount for visible tasks only (after filtering)
     const pendingCount = useMemo(() => todos.filter((t) => !t.done).length, [todos]);
     const addTask = async () => {
@@ -143,11 +211,29 @@ export default function TodoList({ coachId, viewerRole = "coach" }) {
             setErr(e?.message || "Failed to delete task");
         }
     };
+    // ✅ one request for every completed task
+    const clearCompleted = async () => {
+        const doneIds = todos.filter((t) => t.done).map((t) => t.id);
+        if (doneIds.length === 0)
+            return;
+        const snapshot = todos;
+        setTodos((prev) => prev.filter((t) => !t.done));
+        try {
+            await http(BULK_URL, {
+                method: "POST",
+                body: JSON.stringify({ operations: doneIds.map((id) => ({ op: "delete", id })) }),
+            });
+        }
+        catch (e) {
+            setTodos(snapshot);
+            setErr(e?.message || "Failed to clear completed tasks");
+        }
+    };
     const onEnter = (e) => {
         if (e.key === "Enter")
             addTask();
     };
-    return (_jsxs("div", { className: "flex flex-col h-full", children: [_jsxs("div", { className: "flex items-center justify-between mb-3", children: [_jsx("h3", { className: "text-lg font-bold text-[#442F73]", children: "Today's Tasks" }), _jsxs("span", { className: "text-xs bg-gray-100 px-2 py-1 rounded-full", children: ["Pending ", pendingCount] })] }), err && (_jsx("div", { className: "mb-2 text-xs text-red-600 bg-red-50 border border-red-100 rounded-lg px-3 py-2", children: err })), _jsx("div", { className: "flex-1 min-h-0 max-h-[200px] overflow-y-auto custom-scroll", children: loading ? (_jsx("div", { className: "text-sm text-gray-500", children: "Loading tasks..." })) : todos.length === 0 ? (_jsx("div", { className: "h-full flex items-center justify-center", children: _jsx("div", { className: "text-sm text-gray-400", children: "No tasks yet." }) })) : (_jsx("div", { className: "space-y-2", children: todos.map((todo) => {
+    return (_jsxs("div", { className: "flex flex-col h-full", children: [_jsxs("div", { className: "flex items-center justify-between mb-3", children: [_jsx("h3", { className: "text-lg font-bold text-[#442F73]", children: "Today's Tasks" }), _jsxs("div", { className: "flex items-center gap-2", children: [todos.some((t) => t.done) && (_jsx("button", { onClick: clearCompleted, className: "text-xs text-gray-500 hover:text-red-600 transition", title: "Delete all completed tasks", children: "Clear completed" })), _jsxs("span", { className: "text-xs bg-gray-100 px-2 py-1 rounded-full", children: ["Pending ", pendingCount] })] })] }), err && (_jsx("div", { className: "mb-2 text-xs text-red-600 bg-red-50 border border-red-100 rounded-lg px-3 py-2", children: err })), _jsx("div", { className: "flex-1 min-h-0 max-h-[200px] overflow-y-auto custom-scroll", children: loading ? (_jsx("div", { className: "text-sm text-gray-500", children: "Loading tasks..." })) : todos.length === 0 ? (_jsx("div", { className: "h-full flex items-center justify-center", children: _jsx("div", { className: "text-sm text-gray-400", children: "No tasks yet." }) })) : (_jsxs("div", { className: "space-y-2", children: [todos.map((todo) => {
                         const proofRaw = todo.evidence?.proof_url || "";
                         const proofUrl = proofRaw ? toAbsoluteUrlMaybe(proofRaw) : "";
                         const canViewProof = !!proofUrl;
@@ -159,5 +245,5 @@ export default function TodoList({ coachId, viewerRole = "coach" }) {
                                                     }, children: ["View proof", todo.evidence?.proof_meta?.name
                                                             ? ` — ${todo.evidence.proof_meta.name}`
                                                             : ""] }))] })] }), _jsx("button", { onClick: () => deleteTask(todo.id), className: "text-xs text-gray-500 hover:text-red-600 transition shrink-0", title: "Delete", children: "\u2715" })] }, todo.id));
-                    }) })) }), _jsxs("div", { className: "mt-3 flex gap-2", children: [_jsx("input", { value: title, onChange: (e) => setTitle(e.target.value), onKeyDown: onEnter, placeholder: "New task...", className: "flex-1 border rounded-lg px-3 py-2 text-sm", disabled: saving }), _jsx("button", { onClick: addTask, disabled: saving, className: "px-4 rounded-lg bg-gradient-to-r from-[#cea769] to-[#b27715] text-white text-sm disabled:opacity-60", children: saving ? "Saving..." : "Add" })] })] }));
+                    }), nextCursor && (_jsx("button", { onClick: loadMore, disabled: loadingMore, className: "w-full py-1 text-xs text-[#442F73] hover:underline disabled:opacity-60", children: loadingMore ? "Loading..." : "Load more" }))] })) }), _jsxs("div", { className: "mt-3 flex gap-2", children: [_jsx("input", { value: title, onChange: (e) => setTitle(e.target.value), onKeyDown: onEnter, placeholder: "New task...", className: "flex-1 border rounded-lg px-3 py-2 text-sm", disabled: saving }), _jsx("button", { onClick: addTask, disabled: saving, className: "px-4 rounded-lg bg-gradient-to-r from-[#cea769] to-[#b27715] text-white text-sm disabled:opacity-60", children: saving ? "Saving..." : "Add" })] })] }));
 }
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 
 type Evidence = {
   type?: string;
@@ -21,6 +21,25 @@ type ApiTask = {
   evidence?: Evidence;
 };
 
+/** One page of GET tasks/?limit=&cursor= */
+type TaskPage = {
+  results: ApiTask[];
+  next_cursor: string | null;
+  sync_cursor?: string;
+};
+
+/** POST tasks/bulk/ */
+type BulkResult = {
+  results: { op: string; id: string; status: number; task?: ApiTask; detail?: string }[];
+};
+
+/** GET tasks/?since=<sync_cursor> */
+type TaskChanges = {
+  changed: ApiTask[];
+  deleted: string[];
+  sync_cursor: string;
+};
+
 type ViewerRole = "coach" | "qa" | "admin";
 
 type TodoListProps = {
@@ -72,6 +91,8 @@ function isAttendanceTask(t: ApiTask) {
   return isAttendanceType || textLooksAttendance;
 }
 
+const PAGE_SIZE = 50;
+
 /** ✅ Django origin (local) or production origin */
 const API_ORIGIN =
   (import.meta as any).env?.VITE_API_ORIGIN?.toString().trim() ||
@@ -91,6 +112,10 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
   const [loading, setLoading] = useState(false);
   const [saving, setSaving] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // ✅ cursor for "changes since" syncs when the tab gets focus again
+  const syncCursor = useRef<string | null>(null);
 
   // ✅ if not QA/Admin hide Attendance tasks
   const shouldHideAttendance = viewerRole !== "qa" && viewerRole !== "admin";
@@ -98,6 +123,23 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
   // ✅ Add trailing slashes (important for Django/DRF)
   const LIST_URL = `/tasks-api/coaches/${coachId}/tasks/`;
   const DETAIL_URL = (taskId: string) => `/tasks-api/coaches/${coachId}/tasks/${taskId}/`;
+  const BULK_URL = `/tasks-api/coaches/${coachId}/tasks/bulk/`;
+  const PAGE_URL = (cursor?: string | null) =>
+    `${LIST_URL}?limit=${PAGE_SIZE}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`;
+
+  const visibleTasks = (arr: ApiTask[]) =>
+    shouldHideAttendance ? arr.filter((t) => !isAttendanceTask(t)) : arr;
+
+  const fetchPage = async (cursor?: string | null) => {
+    const data = await http<TaskPage | ApiTask[]>(PAGE_URL(cursor));
+    // older servers answer with the whole list
+    if (Array.isArray(data)) return { results: data, next_cursor: null };
+    return {
+      results: data?.results ?? [],
+      next_cursor: data?.next_cursor ?? null,
+      sync_cursor: data?.sync_cursor,
+    };
+  };
 
   useEffect(() => {
     let cancelled = false;
@@ -107,14 +149,13 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
       setErr(null);
 
       try {
-        const data = await http<ApiTask[]>(LIST_URL);
-        const arr = Array.isArray(data) ? data : [];
+        const page = await fetchPage();
 
-        const filtered = shouldHideAttendance
-          ? arr.filter((t) => !isAttendanceTask(t))
-          : arr;
-
-        if (!cancelled) setTodos(filtered);
+        if (!cancelled) {
+          setTodos(visibleTasks(page.results));
+          setNextCursor(page.next_cursor);
+          syncCursor.current = page.sync_cursor ?? null;
+        }
       } catch (e: any) {
         if (!cancelled) setErr(e?.message || "Failed to load tasks");
       } finally {
@@ -129,6 +170,60 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
     };
   }, [coachId, shouldHideAttendance, LIST_URL]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+
+    setLoadingMore(true);
+    setErr(null);
+
+    try {
+      const page = await fetchPage(nextCursor);
+      setTodos((prev) => [...prev, ...visibleTasks(page.results)]);
+      setNextCursor(page.next_cursor);
+    } catch (e: any) {
+      setErr(e?.message || "Failed to load tasks");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // ✅ apply only what changed since the last sync (no full reload)
+  useEffect(() => {
+    async function syncChanges() {
+      const since = syncCursor.current;
+      if (!since || document.visibilityState !== "visible") return;
+
+      try {
+        const data = await http<TaskChanges>(`${LIST_URL}?since=${encodeURIComponent(since)}`);
+        syncCursor.current = data.sync_cursor;
+
+        setTodos((prev) => {
+          const gone = new Set(data.deleted);
+          const changed = new Map(data.changed.map((t) => [t.id, t]));
+          const kept = prev.filter((t) => !gone.has(t.id)).map((t) => changed.get(t.id) ?? t);
+
+          // new tasks go on top; older ones not loaded yet arrive with "Load more"
+          const known = new Set(prev.map((t) => t.id));
+          const oldest = prev[prev.length - 1]?.created_at || "";
+          const added = data.changed
+            .filter((t) => !known.has(t.id) && (!nextCursor || (t.created_at || "") >= oldest))
+            .sort((a, b) => (b.created_at || "").localeCompare(a.created_at || ""));
+
+          return visibleTasks([...added, ...kept]);
+        });
+      } catch {
+        // keep the list as is; the next focus tries again
+      }
+    }
+
+    window.addEventListener("focus", syncChanges);
+    document.addEventListener("visibilitychange", syncChanges);
+    return () => {
+      window.removeEventListener("focus", syncChanges);
+      document.removeEventListener("visibilitychange", syncChanges);
+    };
+  }, [LIST_URL, nextCursor, shouldHideAttendance]);
+
   // ✅ pendingCount for visible tasks only (after filtering)
   const pendingCount = useMemo(() => todos.filter((t) => !t.done).length, [todos]);
 
@@ -192,6 +287,25 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
     }
   };
 
+  // ✅ one request for every completed task
+  const clearCompleted = async () => {
+    const doneIds = todos.filter((t) => t.done).map((t) => t.id);
+    if (doneIds.length === 0) return;
+
+    const snapshot = todos;
+    setTodos((prev) => prev.filter((t) => !t.done));
+
+    try {
+      await http<BulkResult>(BULK_URL, {
+        method: "POST",
+        body: JSON.stringify({ operations: doneIds.map((id) => ({ op: "delete", id })) }),
+      });
+    } catch (e: any) {
+      setTodos(snapshot);
+      setErr(e?.message || "Failed to clear completed tasks");
+    }
+  };
+
   const onEnter = (e: React.KeyboardEvent<HTMLInputElement>) => {
     if (e.key === "Enter") addTask();
   };
@@ -200,9 +314,20 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
     <div className="flex flex-col h-full">
       <div className="flex items-center justify-between mb-3">
         <h3 className="text-lg font-bold text-[#442F73]">Today's Tasks</h3>
-        <span className="text-xs bg-gray-100 px-2 py-1 rounded-full">
-          Pending {pendingCount}
-        </span>
+        <div className="flex items-center gap-2">
+          {todos.some((t) => t.done) && (
+            <button
+              onClick={clearCompleted}
+              className="text-xs text-gray-500 hover:text-red-600 transition"
+              title="Delete all completed tasks"
+            >
+              Clear completed
+            </button>
+          )}
+          <span className="text-xs bg-gray-100 px-2 py-1 rounded-full">
+            Pending {pendingCount}
+          </span>
+        </div>
       </div>
 
       {err && (
@@ -280,6 +405,16 @@ export default function TodoList({ coachId, viewerRole = "coach" }: TodoListProp
                 </div>
               );
             })}
+
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="w-full py-1 text-xs text-[#442F73] hover:underline disabled:opacity-60"
+              >
+                {loadingMore ? "Loading..." : "Load more"}
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -7,8 +7,13 @@ function authHeaders(extra) {
         ...(token ? { Authorization: `Bearer ${token}` } : {}),
     };
 }
-async function fetchCoachTasks(coachId) {
-    const res = await fetch(`/tasks-api/coaches/${coachId}/tasks`, {
+const PAGE_SIZE = 50;
+// one page of the coach's tasks that carry evidence
+async function fetchCoachTasks(coachId, cursor) {
+    const params = new URLSearchParams({ has_evidence: "true", limit: String(PAGE_SIZE) });
+    if (cursor)
+        params.set("cursor", cursor);
+    const res = await fetch(`/tasks-api/coaches/${coachId}/tasks/?${params}`, {
         headers: authHeaders(),
     });
     if (!res.ok) {
@@ -16,7 +21,10 @@ async function fetchCoachTasks(coachId) {
         throw new Error(msg || `Failed to load tasks (${res.status})`);
     }
     const data = await res.json();
-    return Array.isArray(data) ? data : [];
+    // older servers answer with the whole list
+    if (Array.isArray(data))
+        return { results: data, next_cursor: null };
+    return { results: data?.results ?? [], next_cursor: data?.next_cursor ?? null };
 }
 // PATCH reviewed flag 
 async function patchTaskReviewed(coachId, taskId, reviewed) {
@@ -58,6 +66,8 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }) {
     const [tasks, setTasks] = useState([]);
     const [loading, setLoading] = useState(false);
     const [err, setErr] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [q, setQ] = useState("");
     // per-item loading states
     const [busyId, setBusyId] = useState(null);
@@ -69,9 +79,11 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }) {
             setLoading(true);
             setErr(null);
             try {
-                const data = await fetchCoachTasks(coachId);
-                if (!cancelled)
-                    setTasks(data);
+                const page = await fetchCoachTasks(coachId);
+                if (!cancelled) {
+                    setTasks(page.results);
+                    setNextCursor(page.next_cursor);
+                }
             }
             catch (e) {
                 if (!cancelled)
@@ -87,6 +99,23 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }) {
             cancelled = true;
         };
     }, [coachId]);
+    async function loadMore() {
+        if (!nextCursor)
+            return;
+        setLoadingMore(true);
+        setErr(null);
+        try {
+            const page = await fetchCoachTasks(coachId, nextCursor);
+            setTasks((old) => [...old, ...page.results]);
+            setNextCursor(page.next_cursor);
+        }
+        catch (e) {
+            setErr(e?.message || "Failed to load evidence");
+        }
+        finally {
+            setLoadingMore(false);
+        }
+    }
     const API_ORIGIN = import.meta?.env?.VITE_API_ORIGIN || "http://127.0.0.1:8000";
     const toAbsoluteUrl = (u) => {
         if (!u)
@@ -177,5 +206,5 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }) {
     return (_jsxs("div", { className: "bg-white rounded-2xl shadow-sm p-4 h-full min-h-0 flex flex-col", children: [_jsxs("div", { className: "flex items-start justify-between gap-3", children: [_jsxs("div", { className: "min-w-0", children: [_jsx("h3", { className: "text-base font-semibold text-[#241453]", children: "Evidence (Attendance)" }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Showing attendance follow-up evidence saved into Tasks" })] }), _jsx("span", { className: "text-xs text-gray-500 shrink-0", children: evidenceItems.length })] }), _jsx("div", { className: "mt-3", children: _jsx("input", { value: q, onChange: (e) => setQ(e.target.value), placeholder: "Search evidence...", className: "w-full border rounded-lg px-3 py-2 text-sm" }) }), loading && _jsx("div", { className: "text-sm text-gray-500 mt-3", children: "Loading evidence..." }), !loading && err && (_jsx("div", { className: "mt-3 text-xs text-red-600 bg-red-50 border border-red-100 rounded-lg px-3 py-2", children: err })), !loading && !err && evidenceItems.length === 0 && (_jsx("div", { className: "text-sm text-gray-400 mt-3", children: "No evidence found." })), !loading && evidenceItems.length > 0 && (_jsx("div", { className: "mt-3 space-y-2 flex-1 min-h-0 overflow-y-auto custom-scroll pr-1", children: evidenceItems.map((x) => {
                     const isBusy = busyId === x.taskId;
                     return (_jsxs("div", { className: "border rounded-xl p-3", children: [_jsxs("div", { className: "flex items-start justify-between gap-3", children: [_jsx("div", { className: "min-w-0", children: _jsxs("div", { className: "flex items-start gap-3", children: [_jsxs("label", { className: "mt-0.5 flex items-center gap-2 text-xs text-gray-600 select-none", children: [_jsx("input", { type: "checkbox", checked: x.reviewed, disabled: isBusy, onChange: (e) => toggleReviewed(x.taskId, e.target.checked) }), "Reviewed"] }), _jsxs("div", { className: "min-w-0", children: [_jsxs("div", { className: "text-sm font-medium text-gray-800 truncate", children: [x.student || "Unknown student", " ", _jsx("span", { className: "text-gray-400 font-normal", children: "\u2014" }), " ", _jsx("span", { className: "text-gray-700", children: x.date || "No date" })] }), _jsxs("div", { className: "text-xs text-gray-500 mt-1", children: [x.module ? `Module: ${x.module} • ` : "", x.method ? `Method: ${x.method}` : "Method: —"] }), !!x.coachName && (_jsxs("div", { className: "text-xs text-gray-500 mt-1", children: ["Coach: ", x.coachName] })), !!x.notes && (_jsxs("div", { className: "text-xs text-gray-600 mt-2 whitespace-pre-wrap", children: ["Notes: ", x.notes] })), !!x.createdAt && (_jsxs("div", { className: "text-[11px] text-gray-400 mt-2", children: ["Created: ", x.createdAt] }))] })] }) }), _jsxs("div", { className: "shrink-0 flex items-center gap-3", children: [x.proofUrl ? (_jsx("a", { href: toAbsoluteUrl(x.proofUrl), target: "_blank", rel: "noreferrer", className: "text-xs font-medium text-blue-600 hover:underline", children: "View proof" })) : (_jsx("span", { className: "text-xs text-gray-400", children: "No proof" })), _jsx("button", { type: "button", onClick: () => removeTask(x.taskId), disabled: isBusy, className: "w-8 h-8 rounded-full border border-gray-200 text-gray-500 hover:bg-gray-50 hover:text-red-600 transition disabled:opacity-60", title: "Delete", children: "\u2715" })] })] }), isBusy && _jsx("div", { className: "mt-2 text-[11px] text-gray-400", children: "Updating..." })] }, x.taskId));
-                }) }))] }));
+                }) })), !loading && nextCursor && (_jsx("button", { type: "button", onClick: loadMore, disabled: loadingMore, className: "mt-2 w-full py-1 text-xs text-[#241453] hover:underline disabled:opacity-60", children: loadingMore ? "Loading..." : "Load more" }))] }));
 }
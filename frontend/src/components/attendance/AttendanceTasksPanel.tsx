@@ -34,8 +34,19 @@ function authHeaders(extra?: Record<string, string>) {
   };
 }
 
-async function fetchCoachTasks(coachId: number): Promise<Task[]> {
-  const res = await fetch(`/tasks-api/coaches/${coachId}/tasks`, {
+type TaskPage = {
+  results: Task[];
+  next_cursor: string | null;
+};
+
+const PAGE_SIZE = 50;
+
+// one page of the coach's tasks that carry evidence
+async function fetchCoachTasks(coachId: number, cursor?: string | null): Promise<TaskPage> {
+  const params = new URLSearchParams({ has_evidence: "true", limit: String(PAGE_SIZE) });
+  if (cursor) params.set("cursor", cursor);
+
+  const res = await fetch(`/tasks-api/coaches/${coachId}/tasks/?${params}`, {
     headers: authHeaders(),
   });
 
@@ -45,7 +56,9 @@ async function fetchCoachTasks(coachId: number): Promise<Task[]> {
   }
 
   const data = await res.json();
-  return Array.isArray(data) ? data : [];
+  // older servers answer with the whole list
+  if (Array.isArray(data)) return { results: data, next_cursor: null };
+  return { results: data?.results ?? [], next_cursor: data?.next_cursor ?? null };
 }
 
 // PATCH reviewed flag 
@@ -91,6 +104,8 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }: Pro
   const [tasks, setTasks] = useState<Task[]>([]);
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const [q, setQ] = useState("");
 
@@ -106,8 +121,11 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }: Pro
       setLoading(true);
       setErr(null);
       try {
-        const data = await fetchCoachTasks(coachId);
-        if (!cancelled) setTasks(data);
+        const page = await fetchCoachTasks(coachId);
+        if (!cancelled) {
+          setTasks(page.results);
+          setNextCursor(page.next_cursor);
+        }
       } catch (e: any) {
         if (!cancelled) setErr(e?.message || "Failed to load evidence");
       } finally {
@@ -121,6 +139,22 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }: Pro
     };
   }, [coachId]);
 
+  async function loadMore() {
+    if (!nextCursor) return;
+
+    setLoadingMore(true);
+    setErr(null);
+    try {
+      const page = await fetchCoachTasks(coachId, nextCursor);
+      setTasks((old) => [...old, ...page.results]);
+      setNextCursor(page.next_cursor);
+    } catch (e: any) {
+      setErr(e?.message || "Failed to load evidence");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   const API_ORIGIN = (import.meta as any)?.env?.VITE_API_ORIGIN || "http://127.0.0.1:8000";
 
   const toAbsoluteUrl = (u: string) => {
@@ -328,6 +362,17 @@ export default function AttendanceTasksPanel({ coachId, viewerRole = "qa" }: Pro
           })}
         </div>
       )}
+
+      {!loading && nextCursor && (
+        <button
+          type="button"
+          onClick={loadMore}
+          disabled={loadingMore}
+          className="mt-2 w-full py-1 text-xs text-[#241453] hover:underline disabled:opacity-60"
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </button>
+      )}
     </div>
   );
 }